@@ -0,0 +1,84 @@
+"""
+Проверка прав администратора: прежний поиск в списке против реестра
+администраторов в базе данных с множеством в памяти.
+
+Затем проверяются перенос прежнего admins.json и видимость изменений
+между двумя «процессами» — двумя реестрами с отдельными пулами
+соединений к одной базе.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_admins [--admins 1000] [--checks 100000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from provider.database import ScheduleDB
+from provider.pool import ConnectionPool
+from super_admin import AdminManager
+
+
+async def measure(check, user_ids: list) -> float:
+    started = time.perf_counter()
+    for user_id in user_ids:
+        await check(user_id)
+    return (time.perf_counter() - started) / len(user_ids) * 1e9
+
+
+async def main(admins: int, checks: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.db")
+        db = ScheduleDB(ConnectionPool(database, readers=2))
+        await db.open()
+
+        legacy_file = os.path.join(tmp, "admins.json")
+        with open(legacy_file, "w") as file:
+            json.dump(list(range(admins)), file)
+        registry = AdminManager(db.pool, ttl=0.2)
+        print(
+            f"imported from admins.json: {await registry.import_legacy(legacy_file)}, "
+            f"file renamed: {os.path.exists(legacy_file + '.imported')}"
+        )
+
+        # Худший случай для списка: проверяются пользователи, не являющиеся администраторами
+        legacy = list(range(admins))
+
+        async def legacy_get_admin(user_id: int) -> bool:
+            return user_id in legacy
+
+        user_ids = [admins + i for i in range(checks)]
+        legacy_ns = await measure(legacy_get_admin, user_ids[: checks // 10])
+        registry_ns = await measure(registry.get_admin, user_ids)
+        print(
+            f"{admins} admins: list {legacy_ns:8.0f} ns/check, "
+            f"registry {registry_ns:8.0f} ns/check"
+        )
+
+        other_db = ScheduleDB(ConnectionPool(database, readers=1))
+        await other_db.open()
+        other = AdminManager(other_db.pool, ttl=0.2)
+        print(
+            f"other process sees {len(other.admins) if await other.get_admin(0) else 0} admins"
+        )
+        await registry.add_admin(-1)
+        seen_at = time.perf_counter()
+        while not await other.get_admin(-1):
+            await asyncio.sleep(0.01)
+        print(
+            f"new admin visible in the other process after "
+            f"{(time.perf_counter() - seen_at) * 1000:.0f} ms (ttl 200 ms)"
+        )
+        await other_db.close()
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--admins", type=int, default=1000)
+    parser.add_argument("--checks", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(main(args.admins, args.checks))
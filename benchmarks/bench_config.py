@@ -0,0 +1,92 @@
+"""
+Чтение настроек: прежний разбор config.yaml при каждом вызове против
+кэшированного ConfigFile.
+
+Затем на временной копии файла проверяется перезагрузка: по изменению
+времени модификации, по SIGHUP и отказ от некорректного YAML с сохранением
+прежних настроек.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_config [--calls 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import signal
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from resources import config
+from resources.config import ConfigFile
+
+
+def legacy_get_name_db() -> str:
+    # Прежняя реализация: файл открывается и разбирается при каждом вызове
+    with open(config.path, "r") as file:
+        return yaml.safe_load(file)["db_name"]
+
+
+def measure(func, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def rewrite(file_path: Path, old: str, new: str) -> None:
+    file_path.write_text(file_path.read_text().replace(old, new))
+    # Время модификации сдвигается явно: на быстрой ФС две записи подряд
+    # могут получить одинаковую отметку времени
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+async def reload_checks() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "config.yaml"
+        shutil.copy(config.path, file_path)
+        config_file = ConfigFile(file_path, check_interval=0)
+        changes = []
+        config_file.subscribe("db_name", changes.append)
+        print(f"loaded:       db_name={config_file.get()['db_name']}")
+
+        rewrite(file_path, 'db_name: "NBA.db"', 'db_name: "changed.db"')
+        print(
+            f"after edit:   db_name={config_file.get()['db_name']}, notified {changes}"
+        )
+
+        rewrite(file_path, "db_pool:", "db_pool: [")
+        print(f"bad YAML:     db_name={config_file.get()['db_name']}")
+
+        config_file.check_interval = 3600
+        rewrite(
+            file_path,
+            'db_name: "changed.db"\n\ndb_pool: [',
+            'db_name: "sighup.db"\n\ndb_pool:',
+        )
+        config_file.watch_sighup()
+        os.kill(os.getpid(), signal.SIGHUP)
+        await asyncio.sleep(0.1)
+        print(
+            f"after SIGHUP: db_name={config_file.get()['db_name']}, notified {changes}"
+        )
+
+
+def main(calls: int) -> None:
+    legacy_us = measure(legacy_get_name_db, calls // 20)
+    cached_us = measure(config.get_name_db, calls)
+    print(f"{'per-call parse':>15}: {legacy_us:9.2f} us/call")
+    print(f"{'cached':>15}: {cached_us:9.2f} us/call ({legacy_us / cached_us:.0f}x)")
+    asyncio.run(reload_checks())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.calls)
@@ -0,0 +1,129 @@
+"""
+Наплыв обновлений: как aiogram (задача на каждое обновление) против очереди
+обновлений с ограниченным числом обработчиков.
+
+Обработчик имитирует запрос к базе данных случайной задержкой и считает,
+сколько таких запросов выполняется одновременно. Проверяется, что обработка
+сообщений одного чата завершается в порядке их поступления. Для очереди
+обновления получаются через long-polling с поддельным Telegram, который
+отдаёт столько обновлений, сколько запрошено, поэтому видно обратное
+давление: глубина очереди не превышает её размера.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_dispatch [--updates 5000] [--chats 20] [--work 0.002]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from aiogram import Bot, Dispatcher, types
+
+from benchmarks.bench_webhook import make_update
+from dispatch import UpdateQueue, poll
+
+
+class Probe:
+    """
+    Обработчик сообщений, считающий одновременные вызовы и нарушения порядка.
+    """
+
+    def __init__(self, work: float) -> None:
+        self.work = work
+        self.active = 0
+        self.peak = 0
+        self.done = 0
+        self.disorder = 0
+        self.last = {}
+
+    async def __call__(self, message: types.Message) -> None:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        # Время запроса различается, поэтому без упорядочивания поздние
+        # сообщения чата могут завершиться раньше ранних
+        await asyncio.sleep(random.uniform(0, 2 * self.work))
+        if int(message.text) < self.last.get(message.chat.id, -1):
+            self.disorder += 1
+        self.last[message.chat.id] = int(message.text)
+        self.active -= 1
+        self.done += 1
+
+
+def make_dispatcher(probe: Probe) -> Dispatcher:
+    dp = Dispatcher(Bot("123456:BENCH-TOKEN"))
+    dp.register_message_handler(probe)
+    return dp
+
+
+async def unbounded(updates: int, chats: int, work: float) -> None:
+    probe = Probe(work)
+    dp = make_dispatcher(probe)
+    Bot.set_current(dp.bot)
+    Dispatcher.set_current(dp)
+    batch = [
+        types.Update(**make_update(i, i % chats + 1)) for i in range(1, updates + 1)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*(dp.process_update(update) for update in batch))
+    seconds = time.perf_counter() - started
+    await (await dp.bot.get_session()).close()
+    print(
+        f"{'task per update':>18}: {updates / seconds:8.0f} updates/s, "
+        f"peak concurrent {probe.peak:5d}, out of order {probe.disorder}"
+    )
+
+
+async def bounded(
+    updates: int, chats: int, work: float, workers: int, queue_size: int
+) -> None:
+    probe = Probe(work)
+    dp = make_dispatcher(probe)
+    queue = UpdateQueue(dp, workers=workers, queue_size=queue_size)
+    backlog = [make_update(i, i % chats + 1) for i in range(1, updates + 1)]
+    depth = 0
+
+    async def get_updates(offset=None, limit=100, **_):
+        nonlocal depth
+        depth = max(depth, queue.depth)
+        start = (offset or 1) - 1
+        if start >= updates:
+            await asyncio.sleep(3600)
+        return [types.Update(**update) for update in backlog[start : start + limit]]
+
+    dp.bot.get_updates = get_updates
+    started = time.perf_counter()
+    polling = asyncio.create_task(poll(queue))
+    while probe.done < updates:
+        await asyncio.sleep(0.01)
+        depth = max(depth, queue.depth)
+    seconds = time.perf_counter() - started
+    polling.cancel()
+    await queue.stop()
+    await (await dp.bot.get_session()).close()
+    stats = queue.stats()
+    print(
+        f"{f'queue x{workers}':>18}: {updates / seconds:8.0f} updates/s, "
+        f"peak concurrent {probe.peak:5d}, out of order {probe.disorder}"
+    )
+    print(
+        f"{'':>18}  max depth {depth}/{queue_size}, wait p50 {stats['wait_p50_ms']} ms, "
+        f"p99 {stats['wait_p99_ms']} ms, max {stats['wait_max_ms']} ms"
+    )
+
+
+async def main(updates: int, chats: int, work: float, queue_size: int) -> None:
+    print(f"{updates} updates from {chats} chats, handler work {work * 1000:.1f} ms")
+    await unbounded(updates, chats, work)
+    for workers in (8, 32):
+        await bounded(updates, chats, work, workers, queue_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--work", type=float, default=0.002)
+    parser.add_argument("--queue", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.updates, args.chats, args.work, args.queue))
@@ -0,0 +1,81 @@
+"""
+Пропускная способность хранилища состояний FSM: MemoryStorage против
+SQLiteStorage с кэшем и без него (cache_ttl=0, как при нескольких процессах).
+
+Один «диалог» повторяет то, что делают обработчики бота при рассылке:
+чтение состояния, установка состояния, запись и чтение данных, завершение.
+Дополнительно проверяется, что состояние переживает перезапуск хранилища.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_fsm_storage [--users 200] [--rounds 10]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from aiogram.contrib.fsm_storage.memory import MemoryStorage
+
+from provider.database import ScheduleDB
+from provider.pool import ConnectionPool
+from provider.storage import SQLiteStorage
+
+# Операций с хранилищем в одном диалоге
+OPERATIONS_PER_DIALOG = 6
+
+
+async def dialog(storage, user: int) -> None:
+    await storage.get_state(chat=user, user=user)
+    await storage.set_state(
+        chat=user, user=user, state="AdminState:get_message_to_email"
+    )
+    await storage.update_data(
+        chat=user, user=user, data={"group_name": f"group-{user}"}
+    )
+    await storage.get_data(chat=user, user=user)
+    await storage.get_state(chat=user, user=user)
+    await storage.finish(chat=user, user=user)
+
+
+async def measure(storage, users: int, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        # Пользователи общаются с ботом одновременно
+        await asyncio.gather(*(dialog(storage, user) for user in range(users)))
+    seconds = time.perf_counter() - started
+    return users * rounds * OPERATIONS_PER_DIALOG / seconds
+
+
+async def main(users: int, rounds: int) -> None:
+    print(
+        f"{users} users x {rounds} rounds, {OPERATIONS_PER_DIALOG} operations per dialog"
+    )
+    print(
+        f"{'memory':>18}: {await measure(MemoryStorage(), users, rounds):10.0f} ops/s"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.db")
+        db = ScheduleDB(ConnectionPool(database, readers=4))
+        await db.open()
+        for cache_ttl in (60, 0):
+            storage = SQLiteStorage(db.pool, cache_ttl=cache_ttl)
+            ops = await measure(storage, users, rounds)
+            print(f"{f'sqlite cache={cache_ttl}s':>18}: {ops:10.0f} ops/s")
+
+        await storage.set_state(chat=1, user=1, state="AdminState:set_settings")
+        await db.close()
+        db = ScheduleDB(ConnectionPool(database, readers=1))
+        await db.open()
+        restored = await SQLiteStorage(db.pool).get_state(chat=1, user=1)
+        print(f"state after restart: {restored}")
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.rounds))
@@ -0,0 +1,143 @@
+"""
+Скорость импорта расписания из Excel в строках в секунду: прежняя
+построчная вставка через iterrows против пакетной вставки в одной
+транзакции.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_import [--groups 50] [--lessons 100]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+import time
+
+import aiosqlite
+import pandas as pd
+from openpyxl import Workbook
+
+from provider.database import DAYS_OF_WEEK, ScheduleDB
+from provider.pool import ConnectionPool
+
+COLUMNS = [
+    "day_of_week",
+    "start_time",
+    "end_time",
+    "location",
+    "subject_name",
+    "email",
+    "last_name",
+    "first_name",
+]
+
+
+def make_workbook(groups: int, lessons: int) -> bytes:
+    """
+    Создание книги Excel с листом на каждую группу.
+    """
+    wb = Workbook()
+    wb.remove(wb.active)
+    for group in range(groups):
+        ws = wb.create_sheet(f"group-{group}")
+        ws.append(COLUMNS)
+        for i in range(lessons):
+            ws.append(
+                [
+                    DAYS_OF_WEEK[i % 6],
+                    f"{8 + i % 8:02d}:00:00",
+                    f"{9 + i % 8:02d}:30:00",
+                    f"{100 + i}",
+                    f"subject-{i}",
+                    f"student{i}@example.com",
+                    f"last-{i}",
+                    f"first-{i}",
+                ]
+            )
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+async def legacy_import(database: str, excel_bytes: bytes) -> tuple:
+    # Прежняя реализация: по два await на каждую строку листа
+    from benchmarks.bench_parse import legacy_parse_excel
+
+    db = ScheduleDB(ConnectionPool(database, readers=1))
+    await db.create_tables()
+    await db.close()
+    started = time.perf_counter()
+    data = legacy_parse_excel(excel_bytes)
+    parse_seconds = time.perf_counter() - started
+    conn = await aiosqlite.connect(database)
+    rows = 0
+    for group_name, df in data.items():
+        cursor = await conn.execute(
+            "INSERT INTO Groups (group_name) VALUES (?)", (group_name,)
+        )
+        group_id = cursor.lastrowid
+        rows += 1
+        for _, row in df.iterrows():
+            if pd.notna(row["email"]):
+                await conn.execute(
+                    "INSERT INTO Emails (group_id, email, last_name, first_name) "
+                    "VALUES (?, ?, ?, ?)",
+                    (group_id, row["email"], row["last_name"], row["first_name"]),
+                )
+                rows += 1
+        for _, row in df.iterrows():
+            cursor = await conn.execute(
+                "INSERT INTO Schedule (group_id, day_of_week) VALUES (?, ?)",
+                (group_id, row["day_of_week"]),
+            )
+            await conn.execute(
+                "INSERT INTO Subjects (schedule_id, subject_name, start_time, "
+                "end_time, location) VALUES (?, ?, ?, ?, ?)",
+                (
+                    cursor.lastrowid,
+                    row["subject_name"],
+                    row["start_time"].strftime("%H:%M:%S"),
+                    row["end_time"].strftime("%H:%M:%S"),
+                    row["location"],
+                ),
+            )
+            rows += 2
+    await conn.commit()
+    await conn.close()
+    return rows, parse_seconds
+
+
+async def main(groups: int, lessons: int) -> None:
+    excel_bytes = make_workbook(groups, lessons)
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        rows, legacy_parse = await legacy_import(
+            os.path.join(tmp, "legacy.db"), excel_bytes
+        )
+        legacy_seconds = time.perf_counter() - started
+        legacy_write = legacy_seconds - legacy_parse
+
+        db = ScheduleDB(ConnectionPool(os.path.join(tmp, "bulk.db"), readers=1))
+        await db.open()
+        report = await db.insert_data_from_excel(excel_bytes)
+        await db.close()
+
+    bulk_write = report.insert_seconds + report.swap_seconds
+    print(f"rows:    {rows}")
+    print(
+        f"legacy:  total {legacy_seconds:6.2f} s  {rows / legacy_seconds:8.0f} rows/s"
+        f"  write {legacy_write:6.2f} s  {rows / legacy_write:8.0f} rows/s"
+    )
+    print(
+        f"bulk:    total {report.total_seconds:6.2f} s  {report.rows_per_second:8.0f} rows/s"
+        f"  write {bulk_write:6.2f} s  {rows / bulk_write:8.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--lessons", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.groups, args.lessons))
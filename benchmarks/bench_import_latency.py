@@ -0,0 +1,90 @@
+"""
+Задержка обычных запросов во время импорта большой книги Excel:
+разбор в цикле событий против разбора в пуле процессов.
+
+Во время импорта параллельно измеряются задержка ответа вида /id (только
+цикл событий) и запроса расписания группы (цикл событий и SQLite).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_import_latency [--groups 60] [--lessons 200]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_import import make_workbook
+from provider.database import ScheduleDB
+from provider.pool import ConnectionPool
+from provider.workers import WorkerPool
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1] if len(samples) > 1 else samples[0]
+    return f"p50 {p50:7.2f} ms  p99 {p99:8.2f} ms  max {samples[-1]:8.2f} ms"
+
+
+async def probe(request, samples: list, stop: asyncio.Event) -> None:
+    # Запрос «приходит» каждые 5 мс; задержка считается от момента прихода,
+    # поэтому в неё попадает и время, пока цикл событий был занят
+    while not stop.is_set():
+        arrival = time.perf_counter() + 0.005
+        await asyncio.sleep(0.005)
+        await request()
+        samples.append((time.perf_counter() - arrival) * 1000)
+
+
+async def run(workers: int, excel_bytes: bytes, seed_bytes: bytes) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ScheduleDB(
+            ConnectionPool(os.path.join(tmp, "bench.db"), readers=2),
+            WorkerPool(workers),
+        )
+        await db.open()
+        await db.insert_data_from_excel(seed_bytes)
+        # Пул процессов запускается заранее, как после первой загрузки в боте
+        await db.workers.run(len, b"")
+
+        async def id_request():
+            await asyncio.sleep(0)
+
+        async def schedule_request():
+            await db.get_weekly_schedule("group-1")
+
+        id_samples, schedule_samples = [], []
+        stop = asyncio.Event()
+        probes = [
+            asyncio.create_task(probe(id_request, id_samples, stop)),
+            asyncio.create_task(probe(schedule_request, schedule_samples, stop)),
+        ]
+        started = time.perf_counter()
+        await db.insert_data_from_excel(excel_bytes)
+        import_seconds = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*probes)
+        await db.close()
+
+    mode = "inline" if workers <= 0 else f"{workers} process(es)"
+    print(f"parse {mode}, import {import_seconds:.2f} s")
+    print(f"    /id:      {percentiles(id_samples)}")
+    print(f"    schedule: {percentiles(schedule_samples)}")
+
+
+async def main(groups: int, lessons: int) -> None:
+    seed_bytes = make_workbook(groups, 6)
+    excel_bytes = make_workbook(groups, lessons)
+    for workers in (0, 1):
+        await run(workers, excel_bytes, seed_bytes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=60)
+    parser.add_argument("--lessons", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.groups, args.lessons))
@@ -0,0 +1,81 @@
+"""
+Стоимость построения клавиатуры выбора групп на один запрос: прежнее
+построение с запросом к базе против клавиатуры, закэшированной на
+поколение расписания. Учитывается и сериализация разметки для API.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_keyboards [--groups 40] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.payload import prepare_arg
+
+from benchmarks.bench_import import make_workbook
+from keyboards import kb_common
+from provider import db
+from provider.pool import ConnectionPool
+
+
+async def legacy_create_group_inline_buttons() -> InlineKeyboardMarkup:
+    # Прежняя реализация: запрос к базе и новая клавиатура на каждый вызов
+    groups = await db.get_all_groups()
+    keyboard = InlineKeyboardMarkup()
+    for group in groups:
+        keyboard.add(InlineKeyboardButton(text=group, callback_data=group))
+    keyboard.add(InlineKeyboardButton(text="◀Отмена", callback_data="назад"))
+    return keyboard
+
+
+async def measure(func, requests: int) -> tuple:
+    queries = 0
+    get_all_groups = db.get_all_groups
+
+    async def counted_get_all_groups():
+        nonlocal queries
+        queries += 1
+        return await get_all_groups()
+
+    db.get_all_groups = counted_get_all_groups
+    try:
+        started = time.perf_counter()
+        for _ in range(requests):
+            prepare_arg(await func())
+        seconds = time.perf_counter() - started
+
+        tracemalloc.start()
+        prepare_arg(await func())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.get_all_groups = get_all_groups
+    return seconds / requests * 1e6, queries / (requests + 1), peak
+
+
+async def main(groups: int, requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.pool = ConnectionPool(os.path.join(tmp, "bench.db"), readers=1)
+        await db.open()
+        await db.insert_data_from_excel(make_workbook(groups, 6))
+        print(f"{'':>8} {'us/request':>11} {'queries/request':>16} {'peak bytes':>11}")
+        for name, func in (
+            ("legacy", legacy_create_group_inline_buttons),
+            ("cached", kb_common.create_group_inline_buttons),
+        ):
+            micros, queries, peak = await measure(func, requests)
+            print(f"{name:>8} {micros:>11.1f} {queries:>16.3f} {peak:>11}")
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.groups, args.requests))
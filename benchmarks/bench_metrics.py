@@ -0,0 +1,89 @@
+"""
+Накладные расходы метрик и проверка эндпоинта /metrics.
+
+Сначала замеряется цена одного наблюдения гистограммы и обёртки
+registry.timed вокруг пустой корутины. Затем временная база заполняется
+расписанием, запросы расписания выполняются с очисткой кэша (чтобы
+каждый раз работали и SQLite, и PrettyTable), и выводятся оценки p50/p95/p99,
+полученные с запущенного сервера метрик.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_metrics [--requests 500] [--lessons 120]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiohttp
+
+from benchmarks.bench_smtp import free_port
+from metrics import Histogram, MetricsServer, registry
+from provider.database import DAYS_OF_WEEK, ScheduleDB
+from provider.pool import ConnectionPool
+
+
+async def noop() -> None:
+    pass
+
+
+async def overhead(calls: int) -> None:
+    histogram = Histogram()
+    started = time.perf_counter()
+    for i in range(calls):
+        histogram.observe(i * 1e-6)
+    observe_ns = (time.perf_counter() - started) / calls * 1e9
+
+    registry.histogram("bench_noop_seconds", "Пустая корутина")
+    timed_noop = registry.timed("bench_noop_seconds")(noop)
+    timings = []
+    for func in (noop, timed_noop):
+        started = time.perf_counter()
+        for _ in range(calls):
+            await func()
+        timings.append((time.perf_counter() - started) / calls * 1e9)
+    print(
+        f"observe: {observe_ns:.0f} ns, timed coroutine overhead: "
+        f"{timings[1] - timings[0]:.0f} ns per call"
+    )
+
+
+async def main(requests: int, lessons: int) -> None:
+    await overhead(200_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ScheduleDB(ConnectionPool(os.path.join(tmp, "bench.db"), readers=4))
+        await db.open()
+        group_id = await db.create_group("bench")
+        for i in range(lessons):
+            schedule_id = await db.create_schedule(group_id, DAYS_OF_WEEK[i % 6])
+            await db.add_subject(
+                schedule_id, f"subject-{i}", f"{8 + i % 8:02d}:00:00", "", "101"
+            )
+        for _ in range(requests):
+            db.schedule_cache.clear()
+            await db.get_weekly_schedule_by_group("bench")
+        await db.close()
+
+    port = free_port()
+    server = MetricsServer("127.0.0.1", port)
+    await server.start()
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+            text = await response.text()
+            print(
+                f"GET /metrics: HTTP {response.status}, {len(text.splitlines())} lines"
+            )
+    await server.stop()
+    for line in text.splitlines():
+        if "_quantile{" in line and ("get_weekly" in line or "render" in line):
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--lessons", type=int, default=120)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.lessons))
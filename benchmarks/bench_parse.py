@@ -0,0 +1,68 @@
+"""
+Время и пиковая память разбора книги Excel: прежний двойной разбор
+(openpyxl + pandas.read_excel на каждый лист) против потокового
+ExcelParser в режиме только для чтения.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_parse [--groups 60] [--lessons 60]
+"""
+
+import argparse
+import io
+import time
+import tracemalloc
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from benchmarks.bench_import import make_workbook
+from provider.database import REQUIRED_COLUMNS, ExcelParser
+
+
+def legacy_parse_excel(excel_bytes: bytes) -> dict:
+    # Прежняя реализация: полная загрузка книги ради названий листов и
+    # повторный разбор всего файла pandas для каждого листа
+    data = {}
+    wb = load_workbook(filename=io.BytesIO(excel_bytes))
+    for sheet in wb.sheetnames:
+        df = pd.read_excel(io.BytesIO(excel_bytes), sheet_name=sheet)
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing_columns:
+            raise ValueError(f"{sheet}: {', '.join(missing_columns)}")
+        df["start_time"] = pd.to_datetime(df["start_time"], format="%H:%M:%S").dt.time
+        df["end_time"] = pd.to_datetime(df["end_time"], format="%H:%M:%S").dt.time
+        data[sheet] = df
+    return data
+
+
+def measure(func, excel_bytes: bytes) -> tuple:
+    # Время и память замеряются отдельными прогонами: tracemalloc
+    # заметно замедляет выполнение
+    started = time.perf_counter()
+    func(excel_bytes)
+    seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    func(excel_bytes)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+
+def main(groups: int, lessons: int) -> None:
+    excel_bytes = make_workbook(groups, lessons)
+    print(f"workbook: {groups} sheets, {len(excel_bytes) / 2**20:.1f} MiB")
+    for name, func in (
+        ("legacy", legacy_parse_excel),
+        ("streaming", ExcelParser.parse_excel),
+    ):
+        seconds, peak = measure(func, excel_bytes)
+        print(f"{name:>10}: {seconds:7.2f} s, peak {peak:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=60)
+    parser.add_argument("--lessons", type=int, default=60)
+    args = parser.parse_args()
+    main(args.groups, args.lessons)
@@ -0,0 +1,69 @@
+"""
+Сравнение пропускной способности ScheduleDB: пул соединений против
+открытия нового соединения на каждый запрос.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_pool [--requests 2000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiosqlite
+
+from provider.database import ScheduleDB
+from provider.pool import ConnectionPool
+
+
+async def legacy_get_group(database: str, group_name: str):
+    # Поведение до появления пула: новое соединение на каждый вызов
+    conn = await aiosqlite.connect(database)
+    cursor = await conn.execute(
+        "SELECT group_id FROM Groups WHERE LOWER(group_name) = ?",
+        (group_name.lower(),),
+    )
+    group = await cursor.fetchone()
+    await conn.close()
+    return group[0] if group else None
+
+
+async def run(func, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await func(f"group-{i % 50}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.db")
+        db = ScheduleDB(ConnectionPool(database, readers=4))
+        await db.create_tables()
+        for i in range(50):
+            await db.create_group(f"group-{i}")
+
+        legacy_rps = await run(
+            lambda name: legacy_get_group(database, name), requests, concurrency
+        )
+        pooled_rps = await run(db.get_group, requests, concurrency)
+        await db.close()
+
+    print(f"open-per-call: {legacy_rps:10.0f} req/s")
+    print(f"pooled:        {pooled_rps:10.0f} req/s")
+    print(f"speedup:       {pooled_rps / legacy_rps:10.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,133 @@
+"""
+Пропускная способность рассылки: прежняя отправка по одному письму через
+новое SMTP-соединение на каждую рассылку против пула постоянных сессий.
+
+В качестве SMTP-сервера используется локальный aiosmtpd с искусственной
+задержкой ответа, имитирующей сетевой путь до настоящего почтового сервиса.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_smtp [--recipients 300] [--mailings 3] [--latency 0.01]
+"""
+
+import argparse
+import asyncio
+import socket
+import time
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+from aiosmtplib import SMTP
+
+from mail.send import build_message, send_email
+from mail.transport import SMTPPool
+
+LOGIN = "bench@example.com"
+PASSWORD = "secret"
+
+
+class SlowHandler:
+    """
+    Обработчик aiosmtpd, отвечающий на команды с задержкой.
+    """
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.delivered = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        await asyncio.sleep(self.latency)
+        envelope.mail_from = address
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await asyncio.sleep(self.latency)
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        self.delivered += len(envelope.rcpt_tos)
+        return "250 Message accepted"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def authenticate(server, session, envelope, mechanism, auth_data) -> AuthResult:
+    return AuthResult(success=True)
+
+
+async def legacy_send_email(
+    hostname: str, port: int, receivers: list, text: str
+) -> None:
+    # Прежняя реализация: новое соединение на рассылку, письма строго по одному
+    smtp = SMTP(hostname=hostname, port=port)
+    await smtp.connect()
+    await smtp.login(LOGIN, PASSWORD)
+    try:
+        for receiver in receivers:
+            message = build_message(LOGIN, receiver, "Уведомление от NBA", text)
+            await smtp.sendmail(LOGIN, receiver, message)
+    finally:
+        await smtp.quit()
+
+
+async def main(recipients: int, mailings: int, latency: float, sizes: list) -> None:
+    handler = SlowHandler(latency)
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=free_port(),
+        auth_require_tls=False,
+        authenticator=authenticate,
+    )
+    controller.start()
+    hostname, port = controller.hostname, controller.port
+    receivers = [f"student{i}@example.com" for i in range(recipients)]
+    total = recipients * mailings
+    print(
+        f"{recipients} recipients x {mailings} mailings, server latency {latency * 1000:.0f} ms"
+    )
+    try:
+        started = time.perf_counter()
+        for number in range(mailings):
+            await legacy_send_email(hostname, port, receivers, f"Рассылка {number}")
+        seconds = time.perf_counter() - started
+        print(f"{'legacy':>10}: {seconds:7.2f} s  {total / seconds:8.1f} msg/s")
+
+        for size in sizes:
+            pool = SMTPPool(
+                size, hostname=hostname, port=port, username=LOGIN, password=PASSWORD
+            )
+            started = time.perf_counter()
+            for number in range(mailings):
+                failed = await send_email(
+                    receivers, text=f"Рассылка {number}", pool=pool
+                )
+                assert not failed, failed
+            seconds = time.perf_counter() - started
+            await pool.close()
+            print(
+                f"{f'pool={size}':>10}: {seconds:7.2f} s  {total / seconds:8.1f} msg/s"
+            )
+    finally:
+        controller.stop()
+    print(f"delivered: {handler.delivered}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=300)
+    parser.add_argument("--mailings", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+    asyncio.run(main(args.recipients, args.mailings, args.latency, args.sizes))
@@ -0,0 +1,117 @@
+"""
+Рассылка отдельным письмом каждому адресату против писем с несколькими
+адресатами в одной SMTP-транзакции (RCPT TO пачками, как в копии Bcc).
+
+Локальный aiosmtpd считает команды MAIL/RCPT/DATA и принятые байты писем;
+часть адресатов сервер отклоняет, чтобы проверить, что отказ по одному
+адресату не мешает доставке остальным в той же транзакции.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_smtp_batch [--recipients 300] [--latency 0.01]
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiosmtpd.controller import Controller
+
+from benchmarks import bench_smtp
+from mail.send import send_email
+from mail.transport import SMTPPool
+
+
+class CountingHandler(bench_smtp.SlowHandler):
+    """
+    Обработчик с задержкой, считающий команды и байты и отклоняющий
+    адресатов с именем на «reject».
+    """
+
+    def __init__(self, latency: float) -> None:
+        super().__init__(latency)
+        self.reset()
+
+    def reset(self) -> None:
+        self.commands = 0
+        self.data_bytes = 0
+        self.delivered = 0
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        self.commands += 1
+        return await super().handle_MAIL(
+            server, session, envelope, address, mail_options
+        )
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        self.commands += 1
+        if address.startswith("reject"):
+            await asyncio.sleep(self.latency)
+            return "550 No such user here"
+        return await super().handle_RCPT(
+            server, session, envelope, address, rcpt_options
+        )
+
+    async def handle_DATA(self, server, session, envelope):
+        self.commands += 1
+        self.data_bytes += len(envelope.content)
+        return await super().handle_DATA(server, session, envelope)
+
+
+async def main(recipients: int, latency: float, pool_size: int, chunks: list) -> None:
+    handler = CountingHandler(latency)
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=bench_smtp.free_port(),
+        auth_require_tls=False,
+        authenticator=bench_smtp.authenticate,
+    )
+    controller.start()
+    # Каждый двадцатый адрес сервер отклоняет
+    receivers = [
+        f"reject{i}@example.com" if i % 20 == 0 else f"student{i}@example.com"
+        for i in range(recipients)
+    ]
+    rejected = sum(receiver.startswith("reject") for receiver in receivers)
+    text = "Завтра занятия переносятся в аудиторию 301. " * 20
+    print(
+        f"{recipients} recipients ({rejected} rejected), pool={pool_size}, "
+        f"server latency {latency * 1000:.0f} ms"
+    )
+    print(
+        f"{'rcpt/msg':>9} {'seconds':>8} {'commands':>9} {'DATA KiB':>9} "
+        f"{'delivered':>10} {'failed':>7}"
+    )
+    try:
+        for chunk in chunks:
+            pool = SMTPPool(
+                pool_size,
+                hostname=controller.hostname,
+                port=controller.port,
+                username=bench_smtp.LOGIN,
+                password=bench_smtp.PASSWORD,
+            )
+            handler.reset()
+            started = time.perf_counter()
+            failed = await send_email(
+                receivers, text=text, pool=pool, recipients_per_message=chunk
+            )
+            seconds = time.perf_counter() - started
+            await pool.close()
+            assert len(failed) == rejected, failed
+            print(
+                f"{chunk:>9} {seconds:>8.2f} {handler.commands:>9} "
+                f"{handler.data_bytes / 1024:>9.1f} {handler.delivered:>10} {len(failed):>7}"
+            )
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--pool", type=int, default=4)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1, 10, 50, 100])
+    args = parser.parse_args()
+    asyncio.run(main(args.recipients, args.latency, args.pool, args.chunks))
@@ -0,0 +1,100 @@
+"""
+Холодный запуск бота: время импорта ``bot`` по ``python -X importtime``
+и память процесса после импорта.
+
+Каждый прогон — отдельный процесс. Выводятся медиана времени импорта,
+самые тяжёлые модули верхнего уровня и пиковый RSS. Скрипт завершается
+с кодом 1, если медиана превышает ``--max-ms`` или при запуске
+импортируется библиотека, нужная только для загрузки файла Excel или
+отрисовки расписания (openpyxl, numpy, pandas, prettytable).
+
+Порог по умолчанию — примерно полтора замера на эталонной машине
+(медиана около 470 ms), чтобы разброс между прогонами не давал ложных
+падений, а заметная регрессия всё же ловилась.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_startup [--runs 5] [--max-ms 750]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Библиотеки, которые должны загружаться при первом использовании, а не при запуске
+LAZY_MODULES = ("openpyxl", "numpy", "pandas", "prettytable")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+PROBE = (
+    "import resource, bot; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+def run_once() -> tuple:
+    env = dict(os.environ, TOKEN=os.getenv("TOKEN", "123456:BENCH-TOKEN"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            modules[name] = (int(cumulative), len(indent) // 2)
+    rss_kib = int(result.stdout.split()[-1])
+    return modules, rss_kib
+
+
+def main(runs: int, max_ms: float) -> int:
+    samples, rss = [], []
+    for _ in range(runs):
+        modules, rss_kib = run_once()
+        samples.append(modules["bot"][0] / 1000)
+        rss.append(rss_kib / 1024)
+    median_ms = statistics.median(samples)
+    print(
+        f"import bot: median {median_ms:.0f} ms over {runs} runs "
+        f"(min {min(samples):.0f}, max {max(samples):.0f}), peak RSS {statistics.median(rss):.1f} MiB"
+    )
+
+    heaviest = sorted(
+        (
+            (cumulative, name)
+            for name, (cumulative, depth) in modules.items()
+            if depth == 1
+        ),
+        reverse=True,
+    )[:8]
+    for cumulative, name in heaviest:
+        print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+    failed = False
+    loaded = sorted(
+        name
+        for name in modules
+        if name.split(".")[0] in LAZY_MODULES and "." not in name
+    )
+    if loaded:
+        print(f"FAIL: loaded at startup: {', '.join(loaded)}")
+        failed = True
+    if median_ms > max_ms:
+        print(f"FAIL: median import time {median_ms:.0f} ms exceeds {max_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print(f"OK: under {max_ms:.0f} ms, none of {', '.join(LAZY_MODULES)} loaded")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=750)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.max_ms))
@@ -0,0 +1,93 @@
+"""
+Флуд кнопкой «Расписание»: сколько запросов доходит до базы данных без
+ограничения частоты и с ThrottlingMiddleware по настройкам из config.yaml.
+
+Каждый из ``--users`` пользователей отправляет ``--per-second`` сообщений в
+секунду в течение ``--seconds`` секунд. Обработчик группы common считает
+запросы к базе данных, отправка сообщений в Telegram подменена счётчиком
+ответов. Выводится и теоретическая граница числа запросов к базе.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_throttling [--users 50] [--per-second 20] [--seconds 3]
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiogram import Bot, Dispatcher, types
+
+from benchmarks.bench_webhook import make_update
+from resources import config
+from throttling import ThrottlingMiddleware
+
+
+async def flood(throttled: bool, users: int, per_second: float, seconds: float) -> None:
+    dp = Dispatcher(Bot("123456:BENCH-TOKEN"))
+    Bot.set_current(dp.bot)
+    Dispatcher.set_current(dp)
+    queries, replies = 0, 0
+
+    async def get_group(message: types.Message) -> None:
+        nonlocal queries
+        queries += 1
+
+    async def send_message(*_, **__) -> None:
+        nonlocal replies
+        replies += 1
+
+    # Группа обработчика определяется по модулю, как у handlers/common.py
+    get_group.__module__ = "handlers.common"
+    dp.register_message_handler(get_group)
+    dp.bot.send_message = send_message
+    middleware = None
+    if throttled:
+        middleware = ThrottlingMiddleware(**config.get_throttling())
+        dp.middleware.setup(middleware)
+
+    started = time.perf_counter()
+    update_id = 0
+    tick = 0
+    while time.perf_counter() - started < seconds:
+        batch = []
+        for user in range(1, users + 1):
+            update_id += 1
+            batch.append(types.Update(**make_update(update_id, user)))
+        await asyncio.gather(*(dp.process_update(update) for update in batch))
+        tick += 1
+        delay = started + tick / per_second - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    elapsed = time.perf_counter() - started
+    await (await dp.bot.get_session()).close()
+
+    label = "throttled" if throttled else "unlimited"
+    print(f"{label:>10}: {update_id} messages, {queries} db queries, {replies} replies")
+    if middleware is not None:
+        limits = config.get_throttling()["groups"]["common"]
+        per_user = users * (limits["burst"] + limits["rate"] * elapsed)
+        shared = limits["global_burst"] + limits["global_rate"] * elapsed
+        print(
+            f"{'':>10}  bound {min(per_user, shared):.0f} db queries "
+            f"(per user {per_user:.0f}, global {shared:.0f})"
+        )
+        middleware.sweep(time.monotonic() + 3600)
+        print(
+            f"{'':>10}  buckets after idle sweep: {len(middleware.users['common'])}, "
+            f"warned: {len(middleware.warned)}"
+        )
+
+
+async def main(users: int, per_second: float, seconds: float) -> None:
+    print(f"{users} users x {per_second:.0f} msg/s for {seconds:.0f} s")
+    await flood(False, users, per_second, seconds)
+    await flood(True, users, per_second, seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--per-second", type=float, default=20)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.per_second, args.seconds))
@@ -0,0 +1,87 @@
+"""
+Пиковый RSS процесса при обработке загруженной книги Excel: прежний путь
+(файл целиком в памяти, копии BytesIO для openpyxl и pandas) против
+разбора напрямую из временного файла на диске.
+
+Каждый вариант запускается в отдельном процессе, чтобы пики не смешивались.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_upload_memory [--groups 80] [--lessons 300]
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+import resource
+import tempfile
+
+
+def current_rss_mib() -> float:
+    with open("/proc/self/statm") as file:
+        pages = int(file.read().split()[1])
+    return pages * resource.getpagesize() / 2**20
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss в Linux измеряется в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def legacy_upload(path: str) -> None:
+    from benchmarks.bench_parse import legacy_parse_excel
+
+    # Прежний путь: загрузка в BytesIO, затем .read() в один объект bytes
+    with open(path, "rb") as file:
+        downloaded_file = io.BytesIO(file.read())
+    excel_bytes = downloaded_file.read()
+    legacy_parse_excel(excel_bytes)
+
+
+def streamed_upload(path: str) -> None:
+    from provider.database import hash_workbook, prepare_workbook
+
+    hash_workbook(path)
+    prepare_workbook(path)
+
+
+def measure(target, path: str, queue) -> None:
+    # Модули импортируются до замера, чтобы учитывать только обработку файла
+    import openpyxl  # noqa: F401
+    import pandas  # noqa: F401
+
+    import provider.database  # noqa: F401
+
+    before = current_rss_mib()
+    target(path)
+    queue.put((before, peak_rss_mib()))
+
+
+def main(groups: int, lessons: int) -> None:
+    from benchmarks.bench_import import make_workbook
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "upload.xlsx")
+        with open(path, "wb") as file:
+            file.write(make_workbook(groups, lessons))
+        print(f"workbook: {groups} sheets, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        for name, target in (("legacy", legacy_upload), ("streamed", streamed_upload)):
+            queue = context.Queue()
+            process = context.Process(target=measure, args=(target, path, queue))
+            process.start()
+            before, peak = queue.get()
+            process.join()
+            print(
+                f"{name:>9}: RSS before {before:6.1f} MiB, peak {peak:6.1f} MiB, "
+                f"growth {peak - before:6.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=80)
+    parser.add_argument("--lessons", type=int, default=300)
+    args = parser.parse_args()
+    main(args.groups, args.lessons)
@@ -0,0 +1,137 @@
+"""
+Нагрузочный тест режима webhook: синтетические обновления отправляются
+POST-запросами на локальный сервер с заданной частотой, обработчик
+имитирует работу задержкой.
+
+Выводятся p50/p99 времени ответа на запрос (приём в очередь) и времени
+до завершения обработчика, пропускная способность и число отказов 503.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_webhook [--updates 5000] [--rate 500] [--work 0.005]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+from aiogram import Bot, Dispatcher, types
+from aiohttp import web
+
+from benchmarks.bench_smtp import free_port
+from dispatch import UpdateQueue
+from webhook import SECRET_HEADER, WebhookServer
+
+SECRET = "bench-secret"
+
+
+def make_update(update_id: int, chat_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "bench"},
+            "text": str(update_id),
+        },
+    }
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p99 = samples[max(int(len(samples) * 0.99) - 1, 0)]
+    return f"p50 {statistics.median(samples):7.2f} ms  p99 {p99:7.2f} ms"
+
+
+async def main(
+    updates: int,
+    rate: float,
+    concurrency: int,
+    work: float,
+    workers: int,
+    queue_size: int,
+) -> None:
+    bot = Bot("123456:BENCH-TOKEN")
+    dp = Dispatcher(bot)
+    sent_at, handler_ms = {}, []
+
+    async def handler(message: types.Message) -> None:
+        await asyncio.sleep(work)
+        handler_ms.append((time.perf_counter() - sent_at[int(message.text)]) * 1000)
+
+    dp.register_message_handler(handler)
+    queue = UpdateQueue(dp, workers=workers, queue_size=queue_size)
+    server = WebhookServer(queue, secret_token=SECRET)
+    runner = web.AppRunner(server.make_app())
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    url = f"http://127.0.0.1:{port}{server.path}"
+
+    request_ms, statuses = [], {}
+
+    async def post(session: aiohttp.ClientSession, update_id: int) -> None:
+        sent_at[update_id] = time.perf_counter()
+        async with session.post(
+            url,
+            json=make_update(update_id, update_id % 500 + 1),
+            headers={SECRET_HEADER: SECRET},
+        ) as response:
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+        request_ms.append((time.perf_counter() - sent_at[update_id]) * 1000)
+
+    # Открытая модель нагрузки: обновления приходят с заданной частотой
+    # независимо от того, успевает ли сервер их обрабатывать
+    started = time.perf_counter()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        requests = []
+        for update_id in range(updates):
+            delay = started + update_id / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            requests.append(asyncio.create_task(post(session, update_id)))
+        await asyncio.gather(*requests)
+        await queue.join()
+        seconds = time.perf_counter() - started
+        async with session.post(url, json=make_update(0, 0)) as response:
+            unauthorized = response.status
+        async with session.get(f"http://127.0.0.1:{port}/health") as response:
+            health = await response.json()
+    await runner.cleanup()
+    await (await bot.get_session()).close()
+
+    print(
+        f"{updates} updates at {rate:.0f}/s, {workers} workers, "
+        f"queue {queue_size}, handler work {work * 1000:.1f} ms"
+    )
+    print(
+        f"  throughput: {len(handler_ms) / seconds:8.1f} updates/s, statuses {statuses}"
+    )
+    print(f"  request:    {percentiles(request_ms)}")
+    print(f"  handler:    {percentiles(handler_ms)}")
+    print(f"  no secret:  HTTP {unauthorized}")
+    print(f"  health:     {health}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--work", type=float, default=0.005)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--queue", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.updates,
+            args.rate,
+            args.concurrency,
+            args.work,
+            args.workers,
+            args.queue,
+        )
+    )
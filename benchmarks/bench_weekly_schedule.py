@@ -0,0 +1,93 @@
+"""
+Задержка получения недельного расписания в зависимости от числа занятий
+у группы: прежний цикл N+1 против одного запроса get_weekly_schedule.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_weekly_schedule [--repeat 200]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiosqlite
+
+from provider.database import DAYS_OF_WEEK, ScheduleDB
+from provider.pool import ConnectionPool
+
+
+async def legacy_weekly_schedule(database: str, group_name: str) -> list:
+    # Прежняя реализация: запрос группы, запрос на каждый день и
+    # запрос на каждое занятие, каждый раз с новым соединением
+    conn = await aiosqlite.connect(database)
+    cursor = await conn.execute(
+        "SELECT group_id FROM Groups WHERE LOWER(group_name) = ?",
+        (group_name.lower(),),
+    )
+    group_id = (await cursor.fetchone())[0]
+    await conn.close()
+
+    weekly_schedule = {}
+    conn = await aiosqlite.connect(database)
+    for day in DAYS_OF_WEEK:
+        day_conn = await aiosqlite.connect(database)
+        cursor = await day_conn.execute(
+            "SELECT schedule_id FROM Schedule WHERE group_id = ? AND day_of_week = ?",
+            (group_id, day),
+        )
+        schedule_ids = [row[0] for row in await cursor.fetchall()]
+        await day_conn.close()
+        for schedule_id in schedule_ids:
+            cursor = await conn.execute(
+                """
+                SELECT subject_name, start_time, end_time, location
+                FROM Subjects
+                WHERE schedule_id = ?
+                """,
+                (schedule_id,),
+            )
+            weekly_schedule.setdefault(day, []).extend(await cursor.fetchall())
+    await conn.close()
+    return [
+        lesson
+        for day in DAYS_OF_WEEK
+        for lesson in sorted(weekly_schedule.get(day, []), key=lambda x: x[1])
+    ]
+
+
+async def measure(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def main(repeat: int) -> None:
+    print(f"{'lessons':>8} {'N+1, ms':>10} {'single, ms':>11}")
+    for lessons in (6, 30, 120, 480):
+        with tempfile.TemporaryDirectory() as tmp:
+            database = os.path.join(tmp, "bench.db")
+            db = ScheduleDB(ConnectionPool(database, readers=4))
+            await db.open()
+            group_id = await db.create_group("bench")
+            for i in range(lessons):
+                schedule_id = await db.create_schedule(group_id, DAYS_OF_WEEK[i % 6])
+                await db.add_subject(
+                    schedule_id, f"subject-{i}", f"{8 + i % 8:02d}:00:00", "", "101"
+                )
+
+            legacy_ms = await measure(
+                lambda: legacy_weekly_schedule(database, "bench"), repeat
+            )
+            single_ms = await measure(lambda: db.get_weekly_schedule("bench"), repeat)
+            await db.close()
+        print(f"{lessons:>8} {legacy_ms:>10.2f} {single_ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat))
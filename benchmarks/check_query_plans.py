@@ -0,0 +1,81 @@
+"""
+Проверка планов запросов бота через EXPLAIN QUERY PLAN.
+
+Запросы берутся из тех же констант, которые выполняют ScheduleDB,
+очередь писем, хранилище состояний FSM и реестр администраторов.
+Скрипт создаёт временную базу со всеми миграциями и убеждается, что
+каждый запрос с условием использует индекс. Завершается с кодом 1, если
+хотя бы один запрос читает таблицу полным сканированием.
+
+Запуск из корня репозитория:
+    python -m benchmarks.check_query_plans
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import super_admin
+from mail import outbox
+from provider import database, storage
+from provider.database import ScheduleDB
+from provider.pool import ConnectionPool
+
+# Запросы и параметры для них
+QUERIES = {
+    "ScheduleDB.get_group": (database.GET_GROUP_SQL, ("group",)),
+    "ScheduleDB.get_schedule": (database.GET_SCHEDULE_SQL, (1, "Понедельник")),
+    "ScheduleDB.get_emails_by_group": (database.GET_EMAILS_BY_GROUP_SQL, (1,)),
+    "ScheduleDB.get_weekly_schedule": (database.GET_WEEKLY_SCHEDULE_SQL, ("group",)),
+    "ScheduleDB.get_last_import": (database.GET_LAST_IMPORT_SQL, ()),
+    "ScheduleDB.get_generation": (database.GET_GENERATION_SQL, ()),
+    "MailOutbox.claim_due": (outbox.CLAIM_DUE_SQL, (outbox.PENDING, 0.0, 0, 50)),
+    "MailOutbox.next_due_in": (outbox.NEXT_DUE_SQL, (outbox.PENDING,)),
+    "MailOutbox.restore_quota": (outbox.RESTORE_QUOTA_SQL, (outbox.SENT, 0.0)),
+    "MailOutbox.get_progress (active)": (outbox.GET_ACTIVE_SQL, ()),
+    "SQLiteStorage.load": (storage.LOAD_SQL, ("1", "1")),
+    "SQLiteStorage.save (delete)": (storage.DELETE_SQL, ("1", "1")),
+    "SQLiteStorage.purge_expired": (storage.PURGE_EXPIRED_SQL, (0.0,)),
+    "AdminManager.refresh (version)": (super_admin.GET_VERSION_SQL, ()),
+}
+
+# Запросы, которым по смыслу нужна вся таблица
+FULL_SCAN_ALLOWED = {
+    "ScheduleDB.get_all_groups": (database.GET_ALL_GROUPS_SQL, ()),
+    "ScheduleDB.get_imported_groups": (database.GET_IMPORTED_GROUPS_SQL, ()),
+    "MailOutbox.get_progress": (outbox.GET_PROGRESS_SQL, (5,)),
+    "AdminManager.refresh (admins)": (super_admin.GET_ADMINS_SQL, ()),
+}
+
+
+def is_full_scan(detail: str) -> bool:
+    # SCAN (subquery-N) читает промежуточный результат, а не таблицу
+    return (
+        detail.startswith("SCAN")
+        and "USING" not in detail
+        and not detail.startswith("SCAN (")
+    )
+
+
+async def main() -> int:
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ScheduleDB(ConnectionPool(os.path.join(tmp, "plans.db"), readers=1))
+        await db.open()
+        async with db.pool.read() as conn:
+            for name, (query, params) in {**QUERIES, **FULL_SCAN_ALLOWED}.items():
+                cursor = await conn.execute(f"EXPLAIN QUERY PLAN {query}", params)
+                details = [row[3] for row in await cursor.fetchall()]
+                scans = [detail for detail in details if is_full_scan(detail)]
+                ok = not scans or name in FULL_SCAN_ALLOWED
+                failed = failed or not ok
+                print(f"[{'OK' if ok else 'FAIL'}] {name}")
+                for detail in details:
+                    print(f"       {detail}")
+        await db.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,15 +1,40 @@
-from aiogram.utils import executor
-
-from create_bot import dp
+import dispatch
+import super_admin
+import webhook
+from create_bot import dp, storage, updates
 from handlers import admin, common, other
+from mail.outbox import outbox
+from mail.transport import smtp_pool
+from metrics import MetricsMiddleware, MetricsServer, registry
+from provider import db
+from resources import config
+from throttling import ThrottlingMiddleware
+
+metrics_settings = config.get_metrics()
+metrics_server = MetricsServer(metrics_settings["host"], metrics_settings["port"])
 
 
 async def on_startup(_) -> None:
     """
     Функция, выполняющаяся при запуске бота.
 
-    Выводит сообщение в консоль, что бот начал работу.
+    Включает отслеживание изменений конфигурации, открывает пул соединений
+    с базой данных, переносит администраторов из прежнего admins.json,
+    удаляет истёкшие состояния FSM, запускает фоновую отправку писем из
+    очереди и сервер метрик и выводит сообщение в консоль, что бот начал работу.
     """
+    config.config_file.start()
+    await db.open()
+    await super_admin.admin.import_legacy()
+    await storage.purge_expired()
+    outbox.start()
+    if metrics_settings["enabled"]:
+        try:
+            await metrics_server.start()
+        except OSError as err:
+            # Занятый порт не должен мешать работе бота
+            await metrics_server.stop()
+            print(f"Сервер метрик не запущен, бот работает без метрик: {err}")
     print("Бот начал работу!")
 
 
@@ -17,18 +42,59 @@ async def on_shutdown(_) -> None:
     """
     Функция, выполняющаяся при завершении работы бота.
 
-    Выводит сообщение в консоль, что бот выключен.
+    Останавливает фоновую отправку писем, сервер метрик и отслеживание
+    конфигурации, закрывает SMTP-сессии и пул соединений с базой данных
+    и выводит сообщение в консоль, что бот выключен.
     """
+    await metrics_server.stop()
+    await config.config_file.stop()
+    await outbox.stop()
+    await smtp_pool.close()
+    await db.close()
     print("Бот выключен")
 
 
+# Ограничение частоты запросов пользователей по группам обработчиков
+throttling = ThrottlingMiddleware(**config.get_throttling())
+dp.middleware.setup(throttling)
+# Новые ограничения из config.yaml применяются без перезапуска
+config.config_file.subscribe(
+    "throttling", lambda settings: throttling.configure(**settings)
+)
+# Замер времени обработчиков; отклонённые ограничением запросы не учитываются
+dp.middleware.setup(MetricsMiddleware())
+
+registry.gauge("bot_update_queue_depth", "Обновлений в очереди", lambda: updates.depth)
+registry.gauge(
+    "bot_throttled_total",
+    "Запросов, отклонённых ограничением частоты",
+    lambda: throttling.throttled,
+    kind="counter",
+)
+# Показатели кэша отрисованных расписаний
+for stat, description, kind in (
+    ("hits", "Попаданий в кэш расписаний", "counter"),
+    ("misses", "Промахов кэша расписаний", "counter"),
+    ("evictions", "Вытеснений из кэша расписаний", "counter"),
+    ("entries", "Записей в кэше расписаний", "gauge"),
+    ("bytes", "Размер кэша расписаний в байтах", "gauge"),
+):
+    registry.gauge(
+        f"bot_schedule_cache_{stat}",
+        description,
+        lambda stat=stat: db.schedule_cache.stats()[stat],
+        kind=kind,
+    )
+
 # Регистрация обработчиков команд из разных модулей
 admin.register_handlers_admin(dp)
 common.register_handlers_common(dp)
 other.register_handlers_other(dp)
 
 if __name__ == "__main__":
-    # Запуск long-polling
-    executor.start_polling(
-        dp, skip_updates=True, on_startup=on_startup, on_shutdown=on_shutdown
-    )
+    if config.get_webhook()["enabled"]:
+        # Запуск webhook на встроенном сервере aiohttp
+        webhook.start_webhook(updates, on_startup=on_startup, on_shutdown=on_shutdown)
+    else:
+        # Запуск long-polling
+        dispatch.start_polling(updates, on_startup=on_startup, on_shutdown=on_shutdown)
@@ -1,18 +1,30 @@
 import os
 
-from aiogram import Bot
-from aiogram.contrib.fsm_storage.memory import MemoryStorage
 from aiogram.dispatcher import Dispatcher
 from dotenv import load_dotenv
 
+from dispatch import UpdateQueue
+from metrics import TimedBot
+from provider import db
+from provider.storage import SQLiteStorage
+from resources import config
+from update_profiler import SlowUpdateProfiler
+
 # Загрузка переменных окружения из файла .env
 load_dotenv()
 
-# Создание экземпляра MemoryStorage для хранения состояний FSM
-storage = MemoryStorage()
+# Состояния FSM хранятся в базе данных бота и переживают перезапуск
+storage = SQLiteStorage(db.pool, **config.get_fsm_storage())
 
-# Инициализация бота с использованием токена из переменных окружения
-bot = Bot(os.getenv("TOKEN"))
+# Инициализация бота с использованием токена из переменных окружения;
+# длительность запросов к Bot API попадает в метрики
+bot = TimedBot(os.getenv("TOKEN"))
 
 # Создание диспетчера для обработки сообщений и состояний
 dp = Dispatcher(bot, storage=storage)
+
+# Профилирование медленных обновлений, включается командой администратора
+profiler = SlowUpdateProfiler(dp, **config.get_profiling())
+
+# Обновления обрабатываются ограниченным числом обработчиков, по порядку в каждом чате
+updates = UpdateQueue(dp, **config.get_updates())
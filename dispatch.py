@@ -0,0 +1,262 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Set, Tuple
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.utils import executor
+
+from metrics import registry
+
+
+def get_chat_key(update: types.Update) -> Hashable:
+    """
+    Ключ упорядочивания обновления: обновления с одним ключом обрабатываются
+    строго по очереди.
+
+    Args:
+        update (types.Update): Обновление Telegram.
+
+    Returns:
+        Hashable: Идентификатор чата, пользователя или самого обновления,
+        если обновление не относится ни к чату, ни к пользователю.
+    """
+    message = update.message or update.edited_message
+    if message is not None:
+        return message.chat.id
+    callback_query = update.callback_query
+    if callback_query is not None:
+        if callback_query.message is not None:
+            return callback_query.message.chat.id
+        return callback_query.from_user.id
+    return ("update", update.update_id)
+
+
+class UpdateQueue:
+    """
+    Ограниченная очередь обновлений перед диспетчером aiogram.
+
+    Обновления обрабатывает фиксированное число обработчиков, поэтому
+    одновременных запросов к базе данных не больше, чем обработчиков.
+    Обновления одного чата обрабатываются строго по порядку (на этом
+    держатся сценарии FSM), разные чаты обслуживаются по кругу. Когда
+    очередь заполнена, новые обновления не принимаются, пока она не
+    освободится.
+    """
+
+    def __init__(
+        self, dispatcher: Dispatcher, workers: int = 8, queue_size: int = 1000
+    ) -> None:
+        """
+        Args:
+            dispatcher (Dispatcher): Диспетчер aiogram.
+            workers (int): Число одновременно обрабатываемых обновлений.
+            queue_size (int): Максимальное число ожидающих обновлений.
+        """
+        self.dispatcher = dispatcher
+        self.workers = workers
+        self.queue_size = queue_size
+        # Ожидающие обновления по чатам: ключ -> (обновление, время постановки)
+        self._chats: Dict[Hashable, Deque[Tuple[types.Update, float]]] = {}
+        # Чаты, стоящие в очереди на обработку или обрабатываемые прямо сейчас
+        self._scheduled: Set[Hashable] = set()
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._tasks = []
+        self._freed = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.depth = 0
+        self.processed = 0
+        self.errors = 0
+        self.rejected = 0
+        # Время ожидания в очереди последних обновлений, мс
+        self.waits: Deque[float] = deque(maxlen=1024)
+
+    @property
+    def free(self) -> int:
+        """
+        Returns:
+            int: Сколько обновлений ещё поместится в очередь.
+        """
+        return max(0, self.queue_size - self.depth)
+
+    def put_nowait(self, update: types.Update) -> None:
+        """
+        Постановка обновления в очередь.
+
+        Args:
+            update (types.Update): Обновление Telegram.
+
+        Raises:
+            asyncio.QueueFull: Если очередь заполнена.
+        """
+        if self.depth >= self.queue_size:
+            self.rejected += 1
+            raise asyncio.QueueFull
+        key = get_chat_key(update)
+        self._chats.setdefault(key, deque()).append((update, time.perf_counter()))
+        if key not in self._scheduled:
+            self._scheduled.add(key)
+            self._ready.put_nowait(key)
+        self.depth += 1
+        self._idle.clear()
+
+    async def wait_for_capacity(self, count: int = 1) -> None:
+        """
+        Ожидание, пока в очереди освободится место.
+
+        Args:
+            count (int): Сколько обновлений должно поместиться в очередь.
+        """
+        count = min(count, self.queue_size)
+        while self.free < count:
+            self._freed.clear()
+            await self._freed.wait()
+
+    async def join(self) -> None:
+        """
+        Ожидание обработки всех принятых обновлений.
+        """
+        await self._idle.wait()
+
+    async def worker(self) -> None:
+        # Обработчики aiogram получают бота и диспетчер из контекста
+        Bot.set_current(self.dispatcher.bot)
+        Dispatcher.set_current(self.dispatcher)
+        waits = registry.series("bot_update_wait_seconds")
+        durations = registry.series("bot_update_seconds")
+        while True:
+            key = await self._ready.get()
+            pending = self._chats[key]
+            update, queued_at = pending.popleft()
+            started = time.perf_counter()
+            waits.observe(started - queued_at)
+            self.waits.append((started - queued_at) * 1000)
+            try:
+                await self.dispatcher.process_update(update)
+                self.processed += 1
+            except Exception as err:
+                self.errors += 1
+                print(f"Ошибка обработки обновления {update.update_id}: {err}")
+            finally:
+                durations.observe(time.perf_counter() - started)
+                if pending:
+                    # Следующее обновление чата встаёт в конец общей очереди
+                    self._ready.put_nowait(key)
+                else:
+                    del self._chats[key]
+                    self._scheduled.discard(key)
+                self.depth -= 1
+                self._freed.set()
+                if not self.depth:
+                    self._idle.set()
+
+    def start(self) -> None:
+        """
+        Запуск обработчиков очереди.
+        """
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self.worker()) for _ in range(self.workers)
+            ]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Остановка обработчиков после обработки принятых обновлений.
+
+        Args:
+            timeout (float): Сколько секунд ждать обработки оставшихся обновлений.
+        """
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Не обработано обновлений при остановке: {self.depth}")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Глубина очереди, число чатов с ожидающими обновлениями,
+            счётчики и время ожидания в очереди (p50, p99, максимум, мс).
+        """
+        waits = sorted(self.waits)
+        return {
+            "queue": self.depth,
+            "queue_size": self.queue_size,
+            "chats": len(self._chats),
+            "processed": self.processed,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "wait_p50_ms": round(waits[len(waits) // 2], 2) if waits else 0.0,
+            "wait_p99_ms": (
+                round(waits[int(len(waits) * 0.99) - 1], 2) if waits else 0.0
+            ),
+            "wait_max_ms": round(waits[-1], 2) if waits else 0.0,
+        }
+
+
+async def poll(
+    updates: UpdateQueue, batch: int = 100, timeout: int = 20, error_sleep: int = 5
+) -> None:
+    """
+    Long-polling с обратным давлением: новые обновления запрашиваются у
+    Telegram, только когда в очереди освободилось место хотя бы под пачку
+    ``batch`` обновлений, и не больше, чем поместится.
+
+    Args:
+        updates (UpdateQueue): Очередь обновлений.
+        batch (int): Размер пачки обновлений (Telegram отдаёт не больше 100).
+        timeout (int): Таймаут long-polling в секундах.
+        error_sleep (int): Пауза после ошибки запроса в секундах.
+    """
+    bot = updates.dispatcher.bot
+    Bot.set_current(bot)
+    Dispatcher.set_current(updates.dispatcher)
+    updates.start()
+    offset = None
+    while True:
+        await updates.wait_for_capacity(batch)
+        try:
+            received = await bot.get_updates(
+                offset=offset, timeout=timeout, limit=min(batch, updates.free)
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            print(f"Ошибка получения обновлений: {err}")
+            await asyncio.sleep(error_sleep)
+            continue
+        for update in received:
+            updates.put_nowait(update)
+        if received:
+            offset = received[-1].update_id + 1
+
+
+def start_polling(
+    updates: UpdateQueue,
+    on_startup: Callable[[Dispatcher], Awaitable[Any]],
+    on_shutdown: Callable[[Dispatcher], Awaitable[Any]],
+) -> None:
+    """
+    Запуск бота в режиме long-polling через очередь обновлений.
+
+    Args:
+        updates (UpdateQueue): Очередь обновлений.
+        on_startup (Callable[[Dispatcher], Awaitable[Any]]): Функция запуска бота.
+        on_shutdown (Callable[[Dispatcher], Awaitable[Any]]): Функция завершения бота.
+    """
+
+    async def shutdown(dispatcher: Dispatcher) -> None:
+        await updates.stop()
+        await on_shutdown(dispatcher)
+
+    executor.start(
+        updates.dispatcher,
+        poll(updates),
+        skip_updates=True,
+        on_startup=on_startup,
+        on_shutdown=shutdown,
+    )
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from functools import wraps
 from typing import Any, Callable
 
@@ -8,11 +10,12 @@ from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.types import CallbackQuery
 from aiohttp import ClientError
 
-from super_admin import admin
-from create_bot import bot
+from create_bot import bot, profiler
 from keyboards import kb_admin, kb_common
-from mail import send_email
+from mail.outbox import outbox
 from provider import db
+from resources import config
+from super_admin import admin
 
 
 class AdminState(StatesGroup):
@@ -89,8 +92,9 @@ async def get_document(message: types.Message, state: FSMContext) -> None:
     """
     Обработчик команды для получения и обработки документа.
 
-    Проверяет, что документ является файлом Excel, загружает его, читает содержимое,
-    вставляет данные в базу данных и завершает состояние настройки.
+    Проверяет, что документ является файлом Excel допустимого размера, загружает его
+    во временный файл на диске, вставляет данные в базу данных и завершает состояние
+    настройки.
 
     Args:
         message (types.Message): Сообщение от пользователя.
@@ -101,16 +105,53 @@ async def get_document(message: types.Message, state: FSMContext) -> None:
             message.document.mime_type
             == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         ):
+            file_unique_id = message.document.file_unique_id
+            if await db.is_same_upload(file_unique_id):
+                await message.reply(
+                    "Этот файл уже загружен, расписание не изменилось.",
+                    reply_markup=kb_admin.main_menu,
+                )
+                await state.finish()
+                return
+
+            max_upload_bytes = config.get_excel_import()["max_upload_bytes"]
+            if (message.document.file_size or 0) > max_upload_bytes:
+                await message.reply(
+                    f"Файл слишком большой. Максимальный размер: "
+                    f"{max_upload_bytes // 2**20} МБ."
+                )
+                return
+
             file_id = message.document.file_id
             file_info = await bot.get_file(file_id)
-            downloaded_file = await bot.download_file(file_info.file_path)
 
-            excel_bytes = downloaded_file.read()
-            await db.insert_data_from_excel(excel_bytes)
-            await message.reply(
-                "Файл успешно обработан и данные добавлены в базу данных!",
-                reply_markup=kb_admin.main_menu,
-            )
+            # Файл скачивается частями сразу на диск и разбирается оттуда же
+            fd, excel_path = tempfile.mkstemp(suffix=".xlsx")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    await bot.download_file(file_info.file_path, destination=file)
+                report = await db.insert_data_from_excel(excel_path, file_unique_id)
+            finally:
+                os.remove(excel_path)
+            if report.skipped:
+                text = "Содержимое файла не изменилось, расписание осталось прежним."
+            else:
+                text = (
+                    "Файл успешно обработан и данные добавлены в базу данных!\n"
+                    f"Группы: без изменений {report.unchanged}, обновлено {report.updated}, "
+                    f"добавлено {report.added}, удалено {report.removed}.\n"
+                    f"Записано занятий: {report.lessons}, адресов: {report.emails} "
+                    f"({report.total_seconds:.2f} с)"
+                )
+                if report.rejected_emails:
+                    shown = report.rejected_emails[:20]
+                    text += (
+                        f"\nОтклонены недопустимые адреса ({len(report.rejected_emails)}):\n"
+                        + "\n".join(shown)
+                    )
+                    if len(report.rejected_emails) > len(shown):
+                        text += f"\n...и ещё {len(report.rejected_emails) - len(shown)}"
+            await message.reply(text, reply_markup=kb_admin.main_menu)
             await state.finish()
         else:
             await message.reply("Пожалуйста, пришлите файл в формате Excel.")
@@ -118,6 +159,11 @@ async def get_document(message: types.Message, state: FSMContext) -> None:
         await message.reply(
             f"Произошла ошибка при загрузке файла: {str(e)}. Пожалуйста, попробуйте еще раз."
         )
+    except ValueError as e:
+        await message.reply(
+            f"Ошибка в файле: {str(e)}. Текущее расписание не изменено, исправьте файл и "
+            f"пришлите его еще раз."
+        )
     except Exception as e:
         await message.reply(
             f"Произошла неизвестная ошибка: {str(e)}. Пожалуйста, попробуйте еще раз или обратитесь к "
@@ -183,7 +229,8 @@ async def get_text_message_to_email(message: types.Message, state: FSMContext) -
     """
     Обработчик получения текста сообщения для отправки на email.
 
-    Получает текст сообщения, отправляет его на email адреса группы и завершает состояние.
+    Получает текст сообщения, ставит письма на email адреса группы в очередь отправки
+    и завершает состояние.
 
     Args:
         message (types.Message): Сообщение от пользователя.
@@ -196,10 +243,15 @@ async def get_text_message_to_email(message: types.Message, state: FSMContext) -
     elif group_name:
         emails = await db.get_emails_by_group(group_name)
         if emails:
+            # Письма отправит фоновая задача, обработчик только ставит их в очередь
+            mailing_id, queued = await outbox.enqueue(
+                group_name, emails, message.text, created_by=message.from_user.id
+            )
             await message.answer(
-                "Сообщения отправлены!", reply_markup=types.ReplyKeyboardRemove()
+                f"Рассылка №{mailing_id} поставлена в очередь: {queued} адресатов.\n"
+                f"Ход отправки: «📬Рассылки».",
+                reply_markup=kb_admin.main_menu,
             )
-            await send_email(receivers=emails, text=message.text)
         else:
             await message.answer(
                 "Не найдены адреса электронной почты для указанной группы.",
@@ -213,6 +265,63 @@ async def get_text_message_to_email(message: types.Message, state: FSMContext) -
     await state.finish()
 
 
+@admin_required
+async def mailings_progress(message: types.Message) -> None:
+    """
+    Обработчик команды просмотра хода последних рассылок и оценки
+    времени их завершения.
+
+    Args:
+        message (types.Message): Сообщение от пользователя.
+    """
+    mailings = await outbox.get_progress()
+    if not mailings:
+        await message.answer("Рассылок пока не было.")
+        return
+    lines = []
+    for mailing in mailings:
+        line = (
+            f"№{mailing.mailing_id} ({mailing.group_name}, {mailing.created_at}): "
+            f"отправлено {mailing.sent}/{mailing.total}, ошибок {mailing.failed}, "
+            f"в очереди {mailing.pending}"
+        )
+        if mailing.eta_seconds is not None:
+            hours, minutes = divmod(round(mailing.eta_seconds / 60), 60)
+            line += f", завершится примерно через {hours} ч {minutes} мин"
+        lines.append(line)
+    await message.answer("\n".join(lines))
+
+
+@admin_required
+async def toggle_profiling(message: types.Message) -> None:
+    """
+    Обработчик команды включения и выключения профилирования медленных обновлений.
+
+    Без аргумента переключает профилирование, с числом включает его с новым
+    порогом в секундах, «off» выключает.
+
+    Args:
+        message (types.Message): Сообщение от пользователя.
+    """
+    argument = message.get_args() or ""
+    if argument.lower() == "off" or (not argument and profiler.enabled):
+        profiler.disable()
+        await message.answer(
+            f"Профилирование выключено. Сохранено профилей: {profiler.saved}."
+        )
+        return
+    try:
+        threshold = float(argument.replace(",", ".")) if argument else None
+    except ValueError:
+        await message.answer("Укажите порог в секундах, например: /profile 0.5")
+        return
+    profiler.enable(threshold)
+    await message.answer(
+        f"Профилирование включено: обновления дольше {profiler.threshold} с "
+        f"сохраняются в каталог {profiler.directory}."
+    )
+
+
 async def back_to_group_selection(message: types.Message) -> None:
     group_buttons = await kb_common.create_group_inline_buttons()
     await message.answer("Вернулись назад!", reply_markup=types.ReplyKeyboardRemove())
@@ -247,6 +356,11 @@ def register_handlers_admin(dp: Dispatcher) -> None:
     dp.register_message_handler(
         set_group_name, Text(["📧Связаться", "📧Communication"], ignore_case=True)
     )
+    dp.register_message_handler(
+        mailings_progress,
+        Text(["📬Рассылки", "рассылки", "mailings"], ignore_case=True),
+    )
+    dp.register_message_handler(toggle_profiling, commands=["profile"])
 
     dp.register_callback_query_handler(
         back_to_main_menu,
@@ -5,7 +5,13 @@ button_schedule = KeyboardButton("📅Расписание")
 button_info = KeyboardButton("🆘инфо")
 button_admin_panel = KeyboardButton("⚙Обновить данные")
 button_communication = KeyboardButton("📧Связаться")
+button_mailings = KeyboardButton("📬Рассылки")
 
 main_menu = ReplyKeyboardMarkup(resize_keyboard=True, row_width=2).add(
-    button_id, button_schedule, button_info, button_admin_panel, button_communication
+    button_id,
+    button_schedule,
+    button_info,
+    button_admin_panel,
+    button_communication,
+    button_mailings,
 )
@@ -1,3 +1,5 @@
+from typing import Any, Dict, Optional, Tuple
+
 from aiogram.types import (InlineKeyboardButton, InlineKeyboardMarkup,
                            KeyboardButton, ReplyKeyboardMarkup)
 
@@ -7,18 +9,47 @@ back_button = KeyboardButton("◀отмена")
 back_menu = ReplyKeyboardMarkup(resize_keyboard=True).add(back_button)
 
 
+class PrebuiltInlineKeyboardMarkup(InlineKeyboardMarkup):
+    """
+    Инлайн-клавиатура, которая преобразуется в словарь для API только один раз.
+
+    Клавиатура переиспользуется между запросами, поэтому изменять её после
+    первой отправки нельзя.
+    """
+
+    def to_python(self) -> Dict[str, Any]:
+        prebuilt = getattr(self, "_prebuilt", None)
+        if prebuilt is None:
+            prebuilt = super().to_python()
+            self._prebuilt = prebuilt
+        return prebuilt
+
+
+# Клавиатура выбора групп и поколение расписания, для которого она построена
+_group_keyboard: Optional[Tuple[int, PrebuiltInlineKeyboardMarkup]] = None
+
+
 async def create_group_inline_buttons() -> InlineKeyboardMarkup:
     """
     Создает инлайн-кнопки для выбора групп.
 
+    Клавиатура строится один раз на поколение расписания и
+    перестраивается автоматически после загрузки нового файла.
+
     Возвращает:
         InlineKeyboardMarkup: Разметка с инлайн-кнопками для выбора групп.
     """
+    global _group_keyboard
+    generation = await db.current_generation()
+    if _group_keyboard is not None and _group_keyboard[0] == generation:
+        return _group_keyboard[1]
+
     groups = await db.get_all_groups()  # Получаем список групп
 
-    keyboard = InlineKeyboardMarkup()
+    keyboard = PrebuiltInlineKeyboardMarkup()
     for group in groups:
         keyboard.add(InlineKeyboardButton(text=group, callback_data=group))
 
     keyboard.add(InlineKeyboardButton(text="◀Отмена", callback_data="назад"))
+    _group_keyboard = (generation, keyboard)
     return keyboard
@@ -0,0 +1,461 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+
+from aiosmtplib import SMTPRecipientsRefused, SMTPResponseException
+
+from mail.send import build_body, send_chunk, split_messages
+from mail.transport import SMTPPool, smtp_pool
+from provider import db
+from provider.pool import ConnectionPool
+from resources import config
+
+# Состояния письма в очереди
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+# Запросы чтения очереди. Их планы проверяет benchmarks/check_query_plans.py
+GET_PROGRESS_SQL = """
+    SELECT m.mailing_id, m.group_name, m.created_at,
+           COALESCE(SUM(o.status = 'sent'), 0),
+           COALESCE(SUM(o.status = 'dead'), 0),
+           COALESCE(SUM(o.status IN ('pending', 'sending')), 0)
+    FROM Mailings m
+    LEFT JOIN Outbox o ON o.mailing_id = m.mailing_id
+    GROUP BY m.mailing_id
+    ORDER BY m.mailing_id DESC
+    LIMIT ?
+"""
+GET_ACTIVE_SQL = """
+    SELECT COUNT(*) FROM Outbox
+    WHERE status IN ('pending', 'sending')
+    GROUP BY mailing_id
+"""
+RESTORE_QUOTA_SQL = "SELECT COUNT(*) FROM Outbox WHERE status = ? AND sent_at >= ?"
+CLAIM_DUE_SQL = """
+    SELECT mailing_id, message_id, recipient, theme, text FROM (
+        SELECT o.mailing_id, o.message_id, o.recipient, m.theme, m.text,
+               ROW_NUMBER() OVER (
+                   PARTITION BY o.mailing_id ORDER BY o.message_id
+               ) AS turn
+        FROM Outbox o JOIN Mailings m ON m.mailing_id = o.mailing_id
+        WHERE o.status = ? AND o.next_attempt_at <= ?
+    )
+    ORDER BY turn, mailing_id <= ?, mailing_id
+    LIMIT ?
+"""
+NEXT_DUE_SQL = "SELECT MIN(next_attempt_at) FROM Outbox WHERE status = ?"
+
+
+@dataclass
+class MailingProgress:
+    """
+    Ход отправки одной рассылки.
+    """
+
+    mailing_id: int
+    group_name: str
+    created_at: str
+    sent: int
+    failed: int
+    pending: int
+    # Оценка времени до завершения в секундах при отправке на пределе квоты
+    eta_seconds: Optional[float] = None
+
+    @property
+    def total(self) -> int:
+        return self.sent + self.failed + self.pending
+
+
+def is_permanent_error(err: Exception) -> bool:
+    """
+    Проверка, что ошибку доставки бессмысленно повторять.
+
+    Args:
+        err (Exception): Ошибка отправки письма.
+
+    Returns:
+        bool: True для постоянных отказов сервера (коды 5xx).
+    """
+    if isinstance(err, SMTPRecipientsRefused):
+        return all(refused.code >= 500 for refused in err.recipients)
+    return isinstance(err, SMTPResponseException) and err.code >= 500
+
+
+class MailOutbox:
+    """
+    Очередь исходящих писем в SQLite с фоновой доставкой.
+
+    Обработчик только записывает рассылку в очередь (по строке на адресата),
+    а фоновая задача отправляет письма через пул SMTP-сессий. Неудачные
+    отправки повторяются с экспоненциальной задержкой, после исчерпания
+    попыток или постоянного отказа сервера письмо помечается как
+    недоставленное. Очередь переживает перезапуск бота.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        transport: SMTPPool,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        retry_base: float = 30.0,
+        retry_max: float = 3600.0,
+        poll_interval: float = 5.0,
+        recipients_per_message: int = 1,
+    ) -> None:
+        """
+        Args:
+            pool (ConnectionPool): Пул соединений с базой данных.
+            transport (SMTPPool): Пул SMTP-сессий для отправки.
+            batch_size (int): Сколько писем забирается из очереди за раз.
+            max_attempts (int): Число попыток доставки одного письма.
+            retry_base (float): Задержка перед первым повтором в секундах,
+                каждая следующая вдвое больше.
+            retry_max (float): Максимальная задержка перед повтором в секундах.
+            poll_interval (float): Как часто проверять очередь без новых рассылок.
+            recipients_per_message (int): Сколько адресатов одной рассылки
+                указывать в одной SMTP-транзакции (1 — отдельное письмо каждому).
+        """
+        self.pool = pool
+        self.transport = transport
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.poll_interval = poll_interval
+        self.recipients_per_message = recipients_per_message
+        # Рассылка, письмо которой выбрано последним: следующий круг
+        # начинается со следующей за ней рассылки
+        self._last_mailing = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def retry_delay(self, attempts: int) -> float:
+        """
+        Args:
+            attempts (int): Число уже сделанных попыток.
+
+        Returns:
+            float: Задержка перед следующей попыткой в секундах.
+        """
+        return min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+
+    async def enqueue(
+        self,
+        group_name: str,
+        recipients: List[str],
+        text: str,
+        theme: str = "Уведомление от NBA",
+        created_by: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """
+        Постановка рассылки в очередь.
+
+        Args:
+            group_name (str): Название группы.
+            recipients (List[str]): Адресаты.
+            text (str): Текст письма.
+            theme (str): Тема письма.
+            created_by (Optional[int]): Идентификатор администратора в Telegram.
+
+        Returns:
+            Tuple[int, int]: Номер рассылки и число писем в очереди.
+        """
+        # Адреса проверены и очищены от повторов при импорте расписания
+        recipients = list(dict.fromkeys(recipients))
+        async with self.pool.write() as conn:
+            cursor = await conn.execute(
+                """
+                INSERT INTO Mailings (group_name, theme, text, created_by)
+                VALUES (?, ?, ?, ?)
+                """,
+                (group_name, theme, text, created_by),
+            )
+            mailing_id = cursor.lastrowid
+            await conn.executemany(
+                "INSERT INTO Outbox (mailing_id, recipient) VALUES (?, ?)",
+                [(mailing_id, recipient) for recipient in recipients],
+            )
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return mailing_id, len(recipients)
+
+    async def get_progress(self, limit: int = 5) -> List[MailingProgress]:
+        """
+        Ход отправки последних рассылок с оценкой времени завершения.
+
+        Args:
+            limit (int): Сколько последних рассылок вернуть.
+
+        Returns:
+            List[MailingProgress]: Рассылки от новых к старым.
+        """
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(GET_PROGRESS_SQL, (limit,))
+            rows = await cursor.fetchall()
+            cursor = await conn.execute(GET_ACTIVE_SQL)
+            active = [row[0] for row in await cursor.fetchall()]
+        mailings = [MailingProgress(*row) for row in rows]
+        for mailing in mailings:
+            if mailing.pending and self.transport.limiter.buckets:
+                # При отправке по кругу рассылка завершится, когда каждая из
+                # активных рассылок отправит не больше писем, чем осталось ей
+                ahead = sum(min(pending, mailing.pending) for pending in active)
+                mailing.eta_seconds = self.transport.limiter.eta(ahead)
+        return mailings
+
+    async def requeue_interrupted(self) -> None:
+        """
+        Возврат в очередь писем, отправка которых прервалась остановкой бота.
+        """
+        async with self.pool.write() as conn:
+            await conn.execute(
+                "UPDATE Outbox SET status = ? WHERE status = ?", (PENDING, SENDING)
+            )
+
+    async def restore_quota(self) -> None:
+        """
+        Учёт в суточной квоте писем, отправленных за последние 24 часа.
+        """
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(RESTORE_QUOTA_SQL, (SENT, time.time() - 86400))
+            sent = (await cursor.fetchone())[0]
+        self.transport.limiter.restore_daily(sent)
+
+    async def claim_due(self, limit: int) -> List[Tuple[int, int, str, str, str]]:
+        """
+        Выбор писем, время отправки которых наступило, с пометкой «отправляется».
+
+        Письма разных рассылок выбираются по кругу: по одному от каждой
+        рассылки, затем по второму и так далее, поэтому небольшая рассылка
+        не ждёт окончания большой.
+
+        Args:
+            limit (int): Сколько писем выбрать.
+
+        Returns:
+            List[Tuple[int, int, str, str, str]]: Номер рассылки, идентификатор
+            письма, адресат, тема и текст, упорядоченные по рассылкам.
+        """
+        async with self.pool.write() as conn:
+            cursor = await conn.execute(
+                CLAIM_DUE_SQL, (PENDING, time.time(), self._last_mailing, limit)
+            )
+            rows = await cursor.fetchall()
+            if rows:
+                self._last_mailing = rows[-1][0]
+            await conn.executemany(
+                "UPDATE Outbox SET status = ? WHERE message_id = ?",
+                [(SENDING, row[1]) for row in rows],
+            )
+        return sorted(rows)
+
+    async def next_due_in(self) -> float:
+        """
+        Returns:
+            float: Через сколько секунд наступит время ближайшей отправки
+            с учётом квоты (не больше интервала опроса).
+        """
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(NEXT_DUE_SQL, (PENDING,))
+            next_attempt_at = (await cursor.fetchone())[0]
+        if next_attempt_at is None:
+            return self.poll_interval
+        delay = max(next_attempt_at - time.time(), self.transport.limiter.eta(1))
+        return max(0.0, min(delay, self.poll_interval))
+
+    async def deliver(
+        self, rows: List[Tuple[int, int, str, str, str]]
+    ) -> List[Tuple[int, Optional[Exception]]]:
+        """
+        Отправка писем одной рассылки из очереди.
+
+        Письмо кодируется один раз, адресаты разбиваются на SMTP-транзакции
+        по recipients_per_message.
+
+        Args:
+            rows (List[Tuple[int, int, str, str, str]]): Строки claim_due
+                одной рассылки.
+
+        Returns:
+            List[Tuple[int, Optional[Exception]]]: Идентификатор письма и ошибка
+            отправки или None, если письмо доставлено.
+        """
+        _, _, _, theme, text = rows[0]
+        recipients = list(dict.fromkeys(row[2] for row in rows))
+        body = build_body(self.transport.sender, theme, text)
+        chunks = split_messages(recipients, body, self.recipients_per_message)
+        refused: Dict[str, Exception] = {}
+        for chunk_refused in await asyncio.gather(
+            *(send_chunk(self.transport, chunk, message) for chunk, message in chunks)
+        ):
+            refused.update(chunk_refused)
+        return [
+            (message_id, refused.get(recipient))
+            for _, message_id, recipient, _, _ in rows
+        ]
+
+    async def deliver_or_fail(
+        self, rows: List[Tuple[int, int, str, str, str]]
+    ) -> List[Tuple[int, Optional[Exception]]]:
+        """
+        Отправка писем одной рассылки, при которой любая ошибка deliver
+        становится ошибкой отправки каждого письма рассылки.
+
+        Так письма не остаются в состоянии «отправляется», а повторяются
+        с задержкой, как при отказе SMTP-сервера.
+
+        Args:
+            rows (List[Tuple[int, int, str, str, str]]): Строки claim_due
+                одной рассылки.
+
+        Returns:
+            List[Tuple[int, Optional[Exception]]]: Результаты в формате deliver.
+        """
+        try:
+            return await self.deliver(rows)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            print(f"Ошибка отправки рассылки {rows[0][0]}: {err}")
+            return [(row[1], err) for row in rows]
+
+    async def release(self, message_ids: List[int]) -> None:
+        """
+        Возврат выбранных писем в очередь с задержкой перед следующей попыткой,
+        если результат их отправки не удалось записать.
+
+        Args:
+            message_ids (List[int]): Идентификаторы писем.
+        """
+        async with self.pool.write() as conn:
+            await conn.executemany(
+                "UPDATE Outbox SET status = ?, next_attempt_at = ? "
+                "WHERE message_id = ? AND status = ?",
+                [
+                    (PENDING, time.time() + self.retry_base, message_id, SENDING)
+                    for message_id in message_ids
+                ],
+            )
+
+    async def save_results(
+        self, results: List[Tuple[int, Optional[Exception]]]
+    ) -> None:
+        """
+        Запись результатов отправки пачки писем одной транзакцией.
+
+        Args:
+            results (List[Tuple[int, Optional[Exception]]]): Результаты deliver.
+        """
+        now = time.time()
+        async with self.pool.write() as conn:
+            for message_id, err in results:
+                if err is None:
+                    await conn.execute(
+                        "UPDATE Outbox SET status = ?, attempts = attempts + 1, "
+                        "sent_at = ?, last_error = NULL WHERE message_id = ?",
+                        (SENT, now, message_id),
+                    )
+                    continue
+                cursor = await conn.execute(
+                    "SELECT attempts + 1 FROM Outbox WHERE message_id = ?",
+                    (message_id,),
+                )
+                attempts = (await cursor.fetchone())[0]
+                if is_permanent_error(err) or attempts >= self.max_attempts:
+                    status, next_attempt_at = DEAD, now
+                else:
+                    status, next_attempt_at = PENDING, now + self.retry_delay(attempts)
+                await conn.execute(
+                    """
+                    UPDATE Outbox SET status = ?, attempts = ?, next_attempt_at = ?,
+                        last_error = ?
+                    WHERE message_id = ?
+                    """,
+                    (status, attempts, next_attempt_at, repr(err), message_id),
+                )
+
+    async def process_due(self) -> int:
+        """
+        Отправка одной пачки писем, время которых наступило.
+
+        Писем выбирается не больше, чем осталось в суточной квоте почтового
+        сервиса, остальные ждут в очереди. Скорость в секунду выдерживает
+        ограничитель при отправке, поэтому пачка не урезается до числа
+        токенов, накопившихся к этому моменту. Если результаты отправки не удалось
+        записать, письма возвращаются в очередь, а ошибка передаётся дальше.
+
+        Returns:
+            int: Число обработанных писем.
+        """
+        limit = min(self.batch_size, self.transport.limiter.remaining_today())
+        if not limit:
+            return 0
+        batch = await self.claim_due(limit)
+        if batch:
+            mailings = [
+                list(rows) for _, rows in groupby(batch, key=lambda row: row[0])
+            ]
+            results = await asyncio.gather(
+                *(self.deliver_or_fail(rows) for rows in mailings)
+            )
+            try:
+                await self.save_results(
+                    [result for chunk in results for result in chunk]
+                )
+            except Exception:
+                await self.release([row[1] for row in batch])
+                raise
+        return len(batch)
+
+    async def run(self) -> None:
+        """
+        Цикл фоновой доставки писем. Работает до отмены задачи.
+        """
+        self._wakeup = asyncio.Event()
+        await self.requeue_interrupted()
+        await self.restore_quota()
+        while True:
+            try:
+                if await self.process_due():
+                    continue
+                timeout = await self.next_due_in()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                # Ошибка базы данных не должна останавливать доставку навсегда
+                print(f"Ошибка очереди писем: {err}")
+                timeout = self.poll_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """
+        Запуск фоновой доставки писем.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Остановка фоновой доставки. Неотправленные письма остаются в очереди.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+
+outbox = MailOutbox(db.pool, smtp_pool, **config.get_mail_outbox())
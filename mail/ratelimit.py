@@ -0,0 +1,124 @@
+import asyncio
+import time
+from typing import List, Optional
+
+
+class TokenBucket:
+    """
+    Ведро токенов: не больше ``capacity`` писем подряд, далее ``rate`` писем в секунду.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Args:
+            rate (float): Скорость пополнения, токенов в секунду.
+            capacity (float): Вместимость ведра (допустимый всплеск).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, count: int) -> float:
+        """
+        Args:
+            count (int): Сколько токенов нужно.
+
+        Returns:
+            float: Через сколько секунд в ведре наберётся нужное число токенов.
+            Запрос больше вместимости ждёт полного ведра и уходит в долг.
+        """
+        self.refill()
+        missing = min(count, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def consume(self, count: int) -> None:
+        self.refill()
+        self.tokens -= count
+
+
+class RateLimiter:
+    """
+    Ограничение скорости отправки писем по квотам почтового сервиса:
+    писем в секунду и писем в сутки.
+
+    Общий для всей исходящей почты. Письма сверх квоты не отклоняются,
+    а ждут, пока квота освободится.
+    """
+
+    def __init__(self, per_second: float = 0, per_day: int = 0) -> None:
+        """
+        Args:
+            per_second (float): Писем в секунду. 0 — без ограничения.
+            per_day (int): Писем в сутки. 0 — без ограничения.
+        """
+        self.buckets: List[TokenBucket] = []
+        if per_second:
+            self.buckets.append(TokenBucket(per_second, max(per_second, 1)))
+        if per_day:
+            self.daily: Optional[TokenBucket] = TokenBucket(per_day / 86400, per_day)
+            self.buckets.append(self.daily)
+        else:
+            self.daily = None
+        self._lock = asyncio.Lock()
+
+    def remaining_today(self) -> int:
+        """
+        Returns:
+            int: Сколько писем осталось в суточной квоте. Скорость в секунду
+            не учитывается: её выдерживает acquire().
+        """
+        if self.daily is None:
+            return 2**31
+        self.daily.refill()
+        return max(0, int(self.daily.tokens))
+
+    def eta(self, count: int) -> float:
+        """
+        Оценка времени отправки писем при непрерывной работе на пределе квоты.
+
+        Args:
+            count (int): Число писем.
+
+        Returns:
+            float: Секунды до отправки последнего из них.
+        """
+        estimate = 0.0
+        for bucket in self.buckets:
+            bucket.refill()
+            estimate = max(estimate, (count - bucket.tokens) / bucket.rate)
+        return max(0.0, estimate)
+
+    def restore_daily(self, sent: int) -> None:
+        """
+        Учёт писем, отправленных за последние сутки до перезапуска бота.
+
+        Args:
+            sent (int): Число писем, отправленных за последние 24 часа.
+        """
+        if self.daily is not None:
+            self.daily.refill()
+            self.daily.tokens = self.daily.capacity - sent
+
+    async def acquire(self, count: int = 1) -> None:
+        """
+        Ожидание квоты на отправку писем. Ожидающие обслуживаются по очереди.
+
+        Args:
+            count (int): Число писем (адресатов) в отправке.
+        """
+        async with self._lock:
+            while True:
+                delay = max(
+                    (bucket.delay(count) for bucket in self.buckets), default=0.0
+                )
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            for bucket in self.buckets:
+                bucket.consume(count)
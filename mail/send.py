@@ -1,70 +1,168 @@
-import os
-from typing import List
+import asyncio
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from typing import Dict, List, Optional, Tuple
 
-from aiosmtplib import SMTP, SMTPException
-from dotenv import load_dotenv
+from aiosmtplib import SMTPException, SMTPRecipientsRefused
+from aiosmtplib.errors import SMTPRecipientRefused
 
-from mail.validate import validate_email
+from mail.transport import SMTPPool, smtp_pool
+from metrics import registry
 
-load_dotenv()
+# Заголовок To для писем, отправляемых сразу нескольким адресатам
+UNDISCLOSED_RECIPIENTS = "undisclosed-recipients:;"
 
 
+def build_body(sender: str, theme: str, text: str, encode: str = "utf-8") -> bytes:
+    """
+    Формирование письма без заголовка To.
+
+    Письмо кодируется один раз на рассылку, адресат добавляется отдельным
+    заголовком перед отправкой.
+
+    Args:
+        sender (str): Адрес отправителя.
+        theme (str): Тема письма.
+        text (str): Текст письма.
+        encode (str): Кодировка письма.
+
+    Returns:
+        bytes: Заголовки и тело письма в формате MIME.
+    """
+    message = EmailMessage(policy=SMTP_POLICY)
+    message["From"] = sender
+    message["Subject"] = theme
+    message.set_content(text, charset=encode)
+    return message.as_bytes()
+
+
+def address_message(receiver: str, body: bytes) -> bytes:
+    """
+    Добавление заголовка To к уже закодированному письму.
+
+    Args:
+        receiver (str): Адрес получателя или UNDISCLOSED_RECIPIENTS.
+        body (bytes): Письмо, сформированное build_body.
+
+    Returns:
+        bytes: Письмо целиком, с заголовками.
+    """
+    return f"To: {receiver}\r\n".encode("ascii") + body
+
+
+def build_message(
+    sender: str, receiver: str, theme: str, text: str, encode: str = "utf-8"
+) -> bytes:
+    """
+    Формирование письма для одного адресата.
+
+    Args:
+        sender (str): Адрес отправителя.
+        receiver (str): Адрес получателя.
+        theme (str): Тема письма.
+        text (str): Текст письма.
+        encode (str): Кодировка письма.
+
+    Returns:
+        bytes: Письмо целиком, с заголовками.
+    """
+    return address_message(receiver, build_body(sender, theme, text, encode))
+
+
+def split_messages(
+    receivers: List[str], body: bytes, recipients_per_message: int = 1
+) -> List[Tuple[List[str], bytes]]:
+    """
+    Разбиение рассылки на SMTP-транзакции.
+
+    Args:
+        receivers (List[str]): Адресаты.
+        body (bytes): Письмо, сформированное build_body.
+        recipients_per_message (int): Сколько адресатов указывать в одной
+            транзакции (RCPT TO). При 1 каждый адресат получает письмо
+            со своим заголовком To, иначе адресаты скрыты, как в копии Bcc.
+
+    Returns:
+        List[Tuple[List[str], bytes]]: Адресаты и письмо для каждой транзакции.
+    """
+    if recipients_per_message <= 1:
+        return [([receiver], address_message(receiver, body)) for receiver in receivers]
+    message = address_message(UNDISCLOSED_RECIPIENTS, body)
+    return [
+        (receivers[start : start + recipients_per_message], message)
+        for start in range(0, len(receivers), recipients_per_message)
+    ]
+
+
+async def send_chunk(
+    pool: SMTPPool, receivers: List[str], message: bytes
+) -> Dict[str, Exception]:
+    """
+    Отправка одного письма нескольким адресатам в одной SMTP-транзакции.
+
+    Отказ сервера принять часть адресатов не мешает доставке остальным.
+
+    Args:
+        pool (SMTPPool): Пул SMTP-сессий.
+        receivers (List[str]): Адресаты письма.
+        message (bytes): Письмо целиком, с заголовками.
+
+    Returns:
+        Dict[str, Exception]: Недоставленные адресаты и причина отказа.
+    """
+    try:
+        refused, _ = await pool.sendmail(receivers, message)
+    except SMTPRecipientsRefused as err:
+        return {refusal.recipient: refusal for refusal in err.recipients}
+    except (SMTPException, OSError) as err:
+        return {receiver: err for receiver in receivers}
+    return {
+        receiver: SMTPRecipientRefused(response.code, response.message, receiver)
+        for receiver, response in refused.items()
+    }
+
+
+@registry.timed("bot_send_email_seconds")
 async def send_email(
     receivers: List[str],
     theme: str = "Уведомление от NBA",
     text: str = "МЫУ",
     encode: str = "utf-8",
-) -> None:
+    pool: Optional[SMTPPool] = None,
+    recipients_per_message: int = 1,
+) -> List[str]:
     """
     Асинхронная отправка электронного письма (email).
 
+    Письма отправляются параллельно через пул постоянных SMTP-сессий,
+    число одновременных отправок ограничено размером пула. Адреса не
+    проверяются: в базу попадают только проверенные при импорте адреса.
+
     Args:
         receivers (List[str]): Список адресатов.
         theme (str): Тема письма. По умолчанию "Уведомление от NBA".
         text (str): Текст письма. По умолчанию "МЫУ".
         encode (str): Кодировка письма. По умолчанию "utf-8".
+        pool (Optional[SMTPPool]): Пул SMTP-сессий. По умолчанию общий пул бота.
+        recipients_per_message (int): Сколько адресатов указывать в одной
+            SMTP-транзакции. По умолчанию 1 (отдельное письмо каждому).
 
-    Raises:
-        SMTPException: Исключение, возникающее при ошибке отправки письма.
+    Returns:
+        List[str]: Адресаты, которым письмо отправить не удалось.
     """
-
-    mail_login = os.getenv("mail_login")
-    password = os.getenv("mail_password")
-    server = os.getenv("smtp_server")
-    port = int(os.getenv("smtp_port"))
-    charset = f"Content-Type: text/plain; charset={encode}"
-    mime = "MIME-Version: 1.0"
-
-    # Формируем тело письма
-    body = "\r\n".join(
-        (
-            f"From: {mail_login}",
-            f"Subject: {theme}",
-            mime,
-            charset,
-            "",
-            text,
+    pool = pool or smtp_pool
+    body = build_body(pool.sender, theme, text, encode)
+    results = await asyncio.gather(
+        *(
+            send_chunk(pool, chunk, message)
+            for chunk, message in split_messages(
+                receivers, body, recipients_per_message
+            )
         )
     )
-    smtp = None
-    try:
-        # Подключаемся к почтовому сервису
-        smtp = SMTP(hostname=server, port=port)
-        await smtp.connect()
-        await smtp.login(mail_login, password)
-
-        for receiver in receivers:
-            if not await validate_email(receiver):
-                continue
-            else:
-                # Формируем заголовок для каждого адресата
-                receiver_header = f"To: {receiver}"
-                full_body = "\r\n".join((receiver_header, body))
-
-                # Пробуем послать письмо
-                await smtp.sendmail(mail_login, receiver, full_body.encode(encode))
-    except SMTPException as err:
-        print("Что-то пошло не так...")
-        raise err
-    finally:
-        await smtp.quit()
+    failed = []
+    for refused in results:
+        for receiver, err in refused.items():
+            print(f"Не удалось отправить письмо на {receiver}: {err}")
+            failed.append(receiver)
+    return failed
@@ -0,0 +1,198 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from aiosmtplib import SMTP, SMTPException, SMTPServerDisconnected
+from aiosmtplib.response import SMTPResponse
+from dotenv import load_dotenv
+
+from mail.ratelimit import RateLimiter
+from metrics import registry
+from resources import config
+
+load_dotenv()
+
+
+class SMTPPool:
+    """
+    Пул авторизованных SMTP-сессий, переиспользуемых между рассылками.
+
+    Сессия, простоявшая без дела дольше ``noop_after`` секунд, перед
+    использованием проверяется командой NOOP и при необходимости
+    переподключается. Количество одновременных отправок ограничено
+    размером пула.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        noop_after: float = 30.0,
+        hostname: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        """
+        Args:
+            size (int): Максимальное число одновременных SMTP-сессий.
+            noop_after (float): Время простоя в секундах, после которого сессия
+                проверяется командой NOOP.
+            hostname (Optional[str]): SMTP-сервер. По умолчанию берётся из
+                переменной окружения smtp_server.
+            port (Optional[int]): Порт. По умолчанию smtp_port.
+            username (Optional[str]): Логин. По умолчанию mail_login.
+                Пустой логин отключает авторизацию.
+            password (Optional[str]): Пароль. По умолчанию mail_password.
+            limiter (Optional[RateLimiter]): Ограничение скорости отправки,
+                общее для всех писем через пул. По умолчанию без ограничения.
+        """
+        self.size = size
+        self.noop_after = noop_after
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.limiter = limiter or RateLimiter()
+        # Свободные слоты: сессия и время её последнего использования или
+        # None, если сессия в слоте ещё не открыта
+        self._idle: Optional[asyncio.Queue] = None
+
+    @property
+    def sender(self) -> str:
+        """
+        Returns:
+            str: Адрес отправителя.
+        """
+        return self.username or os.getenv("mail_login")
+
+    def _get_idle(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)
+        return self._idle
+
+    async def _connect(self) -> SMTP:
+        """
+        Открытие и авторизация новой SMTP-сессии.
+
+        Returns:
+            SMTP: Подключённый клиент.
+        """
+        smtp = SMTP(
+            hostname=self.hostname or os.getenv("smtp_server"),
+            port=self.port or int(os.getenv("smtp_port")),
+        )
+        await smtp.connect()
+        username = self.sender
+        if username:
+            try:
+                await smtp.login(username, self.password or os.getenv("mail_password"))
+            except BaseException:
+                # Иначе соединение остаётся открытым при каждой повторной попытке
+                smtp.close()
+                raise
+        return smtp
+
+    @staticmethod
+    async def _disconnect(smtp: SMTP) -> None:
+        try:
+            await smtp.quit()
+        except (SMTPException, OSError):
+            smtp.close()
+
+    async def _is_alive(self, smtp: SMTP, idle_since: float) -> bool:
+        if not smtp.is_connected:
+            return False
+        if time.monotonic() - idle_since < self.noop_after:
+            return True
+        try:
+            await smtp.noop()
+            return True
+        except (SMTPException, OSError):
+            return False
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[SMTP]:
+        """
+        Выдаёт рабочую SMTP-сессию на время блока ``async with``.
+
+        Если внутри блока соединение оборвалось, сессия не возвращается
+        в пул и будет открыта заново при следующем использовании.
+
+        Yields:
+            SMTP: Подключённый и авторизованный клиент.
+        """
+        idle = self._get_idle()
+        slot: Optional[Tuple[SMTP, float]] = await idle.get()
+        smtp = None
+        try:
+            if slot is not None and await self._is_alive(*slot):
+                smtp = slot[0]
+            else:
+                if slot is not None:
+                    await self._disconnect(slot[0])
+                smtp = await self._connect()
+            yield smtp
+        except (SMTPServerDisconnected, OSError):
+            if smtp is not None:
+                smtp.close()
+            smtp = None
+            raise
+        finally:
+            idle.put_nowait(
+                (smtp, time.monotonic())
+                if smtp is not None and smtp.is_connected
+                else None
+            )
+
+    async def sendmail(
+        self, receivers: List[str], message: bytes
+    ) -> Tuple[Dict[str, SMTPResponse], str]:
+        """
+        Отправка одного письма с повторной попыткой на новой сессии,
+        если сервер разорвал переиспользуемое соединение.
+
+        Если квота почтового сервиса исчерпана, отправка ждёт её пополнения.
+
+        Args:
+            receivers (List[str]): Адресаты письма.
+            message (bytes): Письмо целиком, с заголовками.
+
+        Returns:
+            Tuple[Dict[str, SMTPResponse], str]: Адресаты, которых сервер
+            отказался принять, и ответ сервера на письмо.
+
+        Raises:
+            SMTPException: Если письмо не удалось отправить ни одному адресату.
+        """
+        await self.limiter.acquire(len(receivers))
+        # Ожидание квоты не входит в замер: он показывает скорость самого сервера
+        with registry.timer("bot_smtp_seconds"):
+            for attempt in range(2):
+                try:
+                    async with self.connection() as smtp:
+                        return await smtp.sendmail(self.sender, receivers, message)
+                except SMTPServerDisconnected:
+                    if attempt:
+                        raise
+
+    async def close(self) -> None:
+        """
+        Закрытие всех открытых сессий. Дожидается завершения текущих отправок.
+        """
+        if self._idle is None:
+            return
+        for _ in range(self.size):
+            slot = await self._idle.get()
+            if slot is not None:
+                await self._disconnect(slot[0])
+        self._idle = None
+
+
+smtp_pool = SMTPPool(
+    **config.get_smtp_pool(), limiter=RateLimiter(**config.get_mail_rate())
+)
@@ -1,4 +1,56 @@
 import re
+from typing import Any, List, Optional, Tuple
+
+# Регулярное выражение компилируется один раз при импорте модуля
+EMAIL_REGEX = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
+
+def normalize_email(value: Any) -> Optional[str]:
+    """
+    Приведение адреса к единому виду: без пробелов по краям и с доменом
+    в нижнем регистре.
+
+    Args:
+        value (Any): Значение ячейки с адресом.
+
+    Returns:
+        Optional[str]: Нормализованный адрес или None, если адрес недопустим.
+    """
+    email = str(value).strip()
+    if EMAIL_REGEX.fullmatch(email) is None:
+        return None
+    local, domain = email.rsplit("@", 1)
+    return f"{local}@{domain.lower()}"
+
+
+def normalize_emails(values: List[Any]) -> Tuple[List[Optional[str]], List[str]]:
+    """
+    Проверка, нормализация и удаление повторов в столбце адресов за один проход.
+
+    Повторы определяются без учёта регистра; остаётся первое вхождение.
+
+    Args:
+        values (List[Any]): Значения столбца с адресами, пустые ячейки — None.
+
+    Returns:
+        Tuple[List[Optional[str]], List[str]]: Столбец той же длины, где на месте
+        пустых, недопустимых и повторных адресов стоит None, и список
+        отклонённых недопустимых адресов.
+    """
+    emails: List[Optional[str]] = []
+    rejected: List[str] = []
+    seen = set()
+    for value in values:
+        email = None if value is None else normalize_email(value)
+        if email is None:
+            if value is not None and str(value).strip():
+                rejected.append(str(value).strip())
+        elif email.lower() in seen:
+            email = None
+        else:
+            seen.add(email.lower())
+        emails.append(email)
+    return emails, rejected
 
 
 async def validate_email(email: str) -> bool:
@@ -11,5 +63,4 @@ async def validate_email(email: str) -> bool:
     Returns:
         bool: True, если email-адрес допустим, False в противном случае.
     """
-    email_regex = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    return bool(re.match(email_regex, email))
+    return EMAIL_REGEX.fullmatch(email) is not None
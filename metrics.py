@@ -0,0 +1,357 @@
+import asyncio
+import functools
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from aiogram import Bot, types
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+from aiohttp import web
+
+# Границы интервалов гистограмм в секундах: от 0,5 мс до ~46 с с шагом √2
+BUCKETS = tuple(0.0005 * 2 ** (i / 2) for i in range(34))
+
+# Квантили, которые выводятся рядом с каждой гистограммой
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Метки серии: отсортированные пары (имя, значение)
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    Гистограмма длительностей с фиксированными интервалами.
+
+    Наблюдение стоит одного двоичного поиска и трёх сложений, память не
+    растёт с числом наблюдений. Квантили оцениваются по интервалам с
+    линейной интерполяцией внутри интервала.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        # Последний счётчик — наблюдения больше верхней границы
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Args:
+            q (float): Квантиль от 0 до 1.
+
+        Returns:
+            float: Оценка квантиля в секундах; 0, если наблюдений нет.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Метрики бота: гистограммы длительностей по сериям с метками и
+    показатели, которые вычисляются при каждом запросе метрик.
+    """
+
+    def __init__(self) -> None:
+        # Имя метрики -> (описание, серии по меткам)
+        self.histograms: Dict[str, Tuple[str, Dict[Labels, Histogram]]] = {}
+        # Имя метрики -> (описание, тип, функция получения значения)
+        self.gauges: Dict[str, Tuple[str, str, Callable[[], float]]] = {}
+
+    def histogram(self, name: str, description: str) -> None:
+        """
+        Объявление гистограммы.
+
+        Args:
+            name (str): Имя метрики в формате Prometheus.
+            description (str): Описание для строки HELP.
+        """
+        self.histograms.setdefault(name, (description, {}))
+
+    def series(self, name: str, **labels: str) -> Histogram:
+        """
+        Args:
+            name (str): Имя объявленной гистограммы.
+            **labels (str): Метки серии.
+
+        Returns:
+            Histogram: Гистограмма серии, созданная при первом обращении.
+
+        Raises:
+            KeyError: Если гистограмма не объявлена.
+        """
+        series = self.histograms[name][1]
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        return histogram
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        func: Callable[[], float],
+        kind: str = "gauge",
+    ) -> None:
+        """
+        Регистрация показателя, значение которого берётся при запросе метрик.
+
+        Args:
+            name (str): Имя метрики в формате Prometheus.
+            description (str): Описание для строки HELP.
+            func (Callable[[], float]): Функция получения текущего значения.
+            kind (str): Тип метрики: gauge или counter.
+        """
+        self.gauges[name] = (description, kind, func)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Замер длительности блока кода, в том числе завершившегося исключением.
+
+        Args:
+            name (str): Имя объявленной гистограммы.
+            **labels (str): Метки серии.
+        """
+        histogram = self.series(name, **labels)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    def timed(
+        self, name: str, **labels: str
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        Декоратор замера длительности функции или корутины.
+
+        Args:
+            name (str): Имя объявленной гистограммы.
+            **labels (str): Метки серии.
+
+        Returns:
+            Callable[[Callable[..., Any]], Callable[..., Any]]: Декоратор.
+        """
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            histogram = self.series(name, **labels)
+            if asyncio.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    started = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        histogram.observe(time.perf_counter() - started)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+
+            return wrapper
+
+        return decorator
+
+    def timed_methods(self, name: str) -> Callable[[Type], Type]:
+        """
+        Декоратор класса: замер длительности всех его публичных корутин
+        с меткой method.
+
+        Args:
+            name (str): Имя объявленной гистограммы.
+
+        Returns:
+            Callable[[Type], Type]: Декоратор класса.
+        """
+
+        def decorator(cls: Type) -> Type:
+            for attr, value in list(vars(cls).items()):
+                if not attr.startswith("_") and asyncio.iscoroutinefunction(value):
+                    setattr(cls, attr, self.timed(name, method=attr)(value))
+            return cls
+
+        return decorator
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: Все метрики в текстовом формате Prometheus. Рядом с каждой
+            гистограммой выводится показатель <имя>_quantile с оценками
+            p50, p95 и p99.
+        """
+        lines: List[str] = []
+        for name, (description, series) in self.histograms.items():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    le = bound if isinstance(bound, str) else f"{bound:.6g}"
+                    lines.append(
+                        f"{name}_bucket{format_labels(labels, le=le)} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+            lines += [
+                f"# HELP {name}_quantile {description} (p50, p95, p99)",
+                f"# TYPE {name}_quantile gauge",
+            ]
+            for labels, histogram in series.items():
+                for q in QUANTILES:
+                    lines.append(
+                        f"{name}_quantile{format_labels(labels, quantile=str(q))} "
+                        f"{histogram.quantile(q):.6f}"
+                    )
+        for name, (description, kind, func) in self.gauges.items():
+            lines += [
+                f"# HELP {name} {description}",
+                f"# TYPE {name} {kind}",
+                f"{name} {func()}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels: Labels, **extra: str) -> str:
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"')) for key, value in pairs
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+registry = MetricsRegistry()
+registry.histogram("bot_handler_seconds", "Время работы обработчиков aiogram")
+registry.histogram("bot_update_seconds", "Время обработки обновления целиком")
+registry.histogram("bot_update_wait_seconds", "Время ожидания обновления в очереди")
+registry.histogram("bot_telegram_seconds", "Время запросов к Bot API Telegram")
+registry.histogram("bot_db_seconds", "Время методов ScheduleDB")
+registry.histogram("bot_render_seconds", "Время отрисовки таблицы расписания")
+registry.histogram("bot_excel_parse_seconds", "Время разбора и проверки файла Excel")
+registry.histogram("bot_send_email_seconds", "Время вызова send_email")
+registry.histogram("bot_smtp_seconds", "Время отправки одного письма по SMTP")
+
+
+class TimedBot(Bot):
+    """
+    Бот, замеряющий длительность каждого запроса к Bot API по методам.
+    """
+
+    async def request(
+        self,
+        method: str,
+        data: Optional[Dict] = None,
+        files: Optional[Dict] = None,
+        **kwargs: Any,
+    ) -> Any:
+        with registry.timer("bot_telegram_seconds", method=method):
+            return await super().request(method, data, files, **kwargs)
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Замер времени работы обработчиков сообщений и колбеков.
+
+    Запросы, отклонённые предыдущими middleware (например, ограничением
+    частоты), до обработчика не доходят и не учитываются.
+    """
+
+    @staticmethod
+    def start(data: Dict[str, Any]) -> None:
+        handler = current_handler.get(None)
+        if handler is not None:
+            module = handler.__module__.rsplit(".", 1)[-1]
+            data["metrics_timing"] = (
+                f"{module}.{handler.__name__}",
+                time.perf_counter(),
+            )
+
+    @staticmethod
+    def finish(data: Dict[str, Any]) -> None:
+        timing = data.get("metrics_timing")
+        if timing is not None:
+            handler, started = timing
+            registry.series("bot_handler_seconds", handler=handler).observe(
+                time.perf_counter() - started
+            )
+
+    async def on_process_message(self, _: types.Message, data: Dict[str, Any]) -> None:
+        self.start(data)
+
+    async def on_post_process_message(
+        self, _: types.Message, __: List[Any], data: Dict[str, Any]
+    ) -> None:
+        self.finish(data)
+
+    async def on_process_callback_query(
+        self, _: types.CallbackQuery, data: Dict[str, Any]
+    ) -> None:
+        self.start(data)
+
+    async def on_post_process_callback_query(
+        self, _: types.CallbackQuery, __: List[Any], data: Dict[str, Any]
+    ) -> None:
+        self.finish(data)
+
+
+class MetricsServer:
+    """
+    Небольшой сервер aiohttp, отдающий метрики по GET /metrics
+    в текстовом формате Prometheus.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9100) -> None:
+        """
+        Args:
+            host (str): Адрес, на котором слушает сервер.
+            port (int): Порт сервера.
+        """
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    async def handle_metrics(self, _: web.Request) -> web.Response:
+        return web.Response(
+            text=registry.render(), content_type="text/plain", charset="utf-8"
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
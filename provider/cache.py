@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Кэш строк с вытеснением давно не использованных записей.
+
+    Ограничивается как числом записей, так и суммарным размером строк,
+    и ведёт счётчики попаданий и промахов.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 4 * 2**20) -> None:
+        """
+        Args:
+            max_entries (int): Максимальное число записей.
+            max_bytes (int): Максимальный суммарный размер строк в байтах (UTF-8).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """
+        Получение значения из кэша.
+
+        Args:
+            key (Hashable): Ключ записи.
+
+        Returns:
+            Optional[str]: Значение или None, если записи нет.
+        """
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: str) -> None:
+        """
+        Сохранение значения в кэш с вытеснением старых записей при переполнении.
+        Значения больше всего лимита памяти не сохраняются.
+
+        Args:
+            key (Hashable): Ключ записи.
+            value (str): Значение.
+        """
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self.pop(key)
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.size_bytes += size
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self.pop(oldest)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Удаление записи из кэша, если она есть.
+
+        Args:
+            key (Hashable): Ключ записи.
+        """
+        if key in self._entries:
+            del self._entries[key]
+            self.size_bytes -= self._sizes.pop(key)
+
+    def clear(self) -> None:
+        """
+        Удаление всех записей. Счётчики при этом сохраняются.
+        """
+        self._entries.clear()
+        self._sizes.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Счётчики попаданий, промахов, вытеснений и текущий размер.
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
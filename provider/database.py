@@ -1,127 +1,497 @@
+import asyncio
+import datetime
+import hashlib
 import io
-from typing import Dict, List, Union
-import aiosqlite
-import pandas as pd
-import prettytable as pt
+import time
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
 from aiosqlite import Connection
-from openpyxl import load_workbook
+
+from mail.validate import normalize_email, normalize_emails
+from metrics import registry
+from provider import migrations
+from provider.cache import LRUCache
+from provider.pool import ConnectionPool
+from provider.workers import WorkerPool
 from resources import config
 
+# Дни недели в порядке их вывода в расписании
+DAYS_OF_WEEK = (
+    "Понедельник",
+    "Вторник",
+    "Среда",
+    "Четверг",
+    "Пятница",
+    "Суббота",
+)
+
+
+def get_day_index(day_of_week: str) -> Optional[int]:
+    """
+    Получение порядкового номера дня недели.
+
+    Args:
+        day_of_week (str): Название дня недели.
+
+    Returns:
+        Optional[int]: Номер дня, начиная с нуля, или None, если день неизвестен.
+    """
+    try:
+        return DAYS_OF_WEEK.index(day_of_week)
+    except ValueError:
+        return None
+
+
+def normalize_group_name(group_name: str) -> str:
+    """
+    Приведение названия группы к виду, по которому группа ищется в базе.
+
+    Args:
+        group_name (str): Название группы.
+
+    Returns:
+        str: Название без пробелов по краям в нижнем регистре (в том числе
+        для кириллицы, в отличие от LOWER в SQLite).
+    """
+    return group_name.strip().lower()
+
+
+# Столбцы, обязательные для каждого листа книги
+REQUIRED_COLUMNS = (
+    "day_of_week",
+    "start_time",
+    "end_time",
+    "location",
+    "subject_name",
+    "email",
+    "last_name",
+    "first_name",
+)
+
+# Данные листа по столбцам: название столбца -> значения по строкам
+SheetColumns = Dict[str, list]
+
+
+def format_time(value: Any) -> str:
+    """
+    Приведение значения ячейки со временем к строке формата ЧЧ:ММ:СС.
+
+    Args:
+        value (Any): Время из ячейки (time, datetime или строка).
+
+    Returns:
+        str: Время в формате ЧЧ:ММ:СС.
+
+    Raises:
+        ValueError: Если значение нельзя интерпретировать как время.
+    """
+    if isinstance(value, datetime.datetime):
+        value = value.time()
+    if isinstance(value, datetime.time):
+        return value.strftime("%H:%M:%S")
+    if isinstance(value, str):
+        parsed = datetime.datetime.strptime(value.strip(), "%H:%M:%S")
+        return parsed.strftime("%H:%M:%S")
+    raise ValueError(f"Некорректное значение времени: {value!r}")
+
 
 class ExcelParser:
     @staticmethod
-    def parse_excel(excel_bytes: bytes) -> Dict[str, pd.DataFrame]:
+    def iter_sheets(
+        source: Union[bytes, str, BinaryIO],
+    ) -> Iterator[Tuple[str, SheetColumns]]:
         """
-        Парсинг данных из файла Excel и возврат словаря с DataFrame для каждого листа.
+        Потоковый разбор файла Excel лист за листом.
+
+        Книга открывается один раз в режиме только для чтения, строки листа
+        читаются по одной и раскладываются по столбцам, время начала и
+        окончания занятий приводится к строкам сразу при чтении.
 
         Args:
-            excel_bytes (bytes): Двоичные данные файла Excel.
+            source (Union[bytes, str, BinaryIO]): Двоичные данные, путь к файлу
+                или открытый файл Excel.
 
-        Returns:
-            Dict[str, pd.DataFrame]: Словарь, где ключ - название листа, значение - DataFrame с данными.
-        """
-        data = {}
-        wb = load_workbook(filename=io.BytesIO(excel_bytes))
-        required_columns = [
-            "day_of_week",
-            "start_time",
-            "end_time",
-            "location",
-            "subject_name",
-            "email",
-            "last_name",
-            "first_name",
-        ]
-
-        for sheet in wb.sheetnames:
-            df = pd.read_excel(io.BytesIO(excel_bytes), sheet_name=sheet)
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                raise ValueError(
-                    f"Отсутствует столбец  '{sheet}': {', '.join(missing_columns)}"
-                )
-            df["start_time"] = pd.to_datetime(
-                df["start_time"], format="%H:%M:%S"
-            ).dt.time
-            df["end_time"] = pd.to_datetime(df["end_time"], format="%H:%M:%S").dt.time
-            data[sheet] = df
-        return data
+        Yields:
+            Tuple[str, SheetColumns]: Название листа и его данные по столбцам.
 
+        Raises:
+            ValueError: Если на листе нет обязательных столбцов или время указано
+                в неверном формате.
+        """
+        # openpyxl (вместе с numpy) нужен только при загрузке файла, поэтому
+        # импортируется при первом разборе, а не при запуске бота
+        from openpyxl import load_workbook
+
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        wb = load_workbook(filename=source, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                yield ws.title, ExcelParser.read_sheet(ws)
+        finally:
+            wb.close()
 
-class ScheduleDB:
     @staticmethod
-    async def connect_to_db() -> Connection:
+    def read_sheet(ws: Any) -> SheetColumns:
         """
-        Установление соединения с базой данных.
+        Чтение одного листа книги в виде столбцов.
+
+        Args:
+            ws (Any): Лист книги openpyxl в режиме только для чтения.
 
         Returns:
-            Connection: Объект соединения с базой данных.
+            SheetColumns: Данные листа по обязательным столбцам.
         """
-        return await aiosqlite.connect(config.get_name_db())
+        # Размеры листа в файле бывают неверными, поэтому читаются все строки
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
+        if missing_columns:
+            raise ValueError(
+                f"Отсутствует столбец  '{ws.title}': {', '.join(missing_columns)}"
+            )
+        positions = [header.index(col) for col in REQUIRED_COLUMNS]
+        columns = [[] for _ in REQUIRED_COLUMNS]
 
-    async def create_tables(self) -> None:
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            for position, column in zip(positions, columns):
+                column.append(row[position] if position < len(row) else None)
+
+        data = dict(zip(REQUIRED_COLUMNS, columns))
+        try:
+            data["start_time"] = [format_time(value) for value in data["start_time"]]
+            data["end_time"] = [format_time(value) for value in data["end_time"]]
+        except ValueError as e:
+            raise ValueError(f"Ошибка во времени на листе '{ws.title}': {e}") from e
+        return data
+
+    @staticmethod
+    def parse_excel(source: Union[bytes, str, BinaryIO]) -> Dict[str, SheetColumns]:
         """
-        Создание таблиц в базе данных.
+        Парсинг данных из файла Excel и возврат словаря с данными каждого листа.
+
+        Args:
+            source (Union[bytes, str, BinaryIO]): Двоичные данные, путь к файлу
+                или открытый файл Excel.
+
+        Returns:
+            Dict[str, SheetColumns]: Словарь, где ключ - название листа, значение -
+            данные листа по столбцам.
         """
-        conn = await self.connect_to_db()
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS Groups (
-                group_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                group_name VARCHAR(50)
-            );
-            """
+        return dict(ExcelParser.iter_sheets(source))
+
+
+@dataclass
+class ImportBatches:
+    """
+    Строки для массовой вставки, подготовленные из листов Excel.
+    """
+
+    groups: List[tuple] = field(default_factory=list)
+    schedule: List[tuple] = field(default_factory=list)
+    subjects: List[tuple] = field(default_factory=list)
+    emails: List[tuple] = field(default_factory=list)
+
+
+@dataclass
+class ImportReport:
+    """
+    Итоги импорта расписания из файла Excel.
+    """
+
+    groups: int
+    lessons: int
+    emails: int
+    parse_seconds: float
+    insert_seconds: float
+    swap_seconds: float
+    unchanged: int = 0
+    updated: int = 0
+    added: int = 0
+    removed: int = 0
+    skipped: bool = False
+    # Недопустимые адреса в виде «группа: адрес», не попавшие в базу
+    rejected_emails: List[str] = field(default_factory=list)
+
+    @property
+    def total_seconds(self) -> float:
+        return self.parse_seconds + self.insert_seconds + self.swap_seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.groups + self.lessons * 2 + self.emails
+        return rows / self.total_seconds if self.total_seconds else 0.0
+
+
+def validate_schedule_data(data: Dict[str, SheetColumns]) -> None:
+    """
+    Проверка данных книги перед заменой расписания.
+
+    Args:
+        data (Dict[str, SheetColumns]): Данные листов Excel.
+
+    Raises:
+        ValueError: Если книга пуста, названия групп повторяются без учёта
+            регистра, встречаются неизвестные дни недели или занятия без названия.
+    """
+    if not data:
+        raise ValueError("В файле нет ни одного листа с расписанием")
+
+    errors = []
+    seen_groups = set()
+    for group_name, columns in data.items():
+        if normalize_group_name(group_name) in seen_groups:
+            errors.append(f"группа '{group_name}' встречается несколько раз")
+        seen_groups.add(normalize_group_name(group_name))
+
+        unknown_days = {
+            str(day) for day in columns["day_of_week"] if get_day_index(day) is None
+        }
+        if unknown_days:
+            errors.append(
+                f"'{group_name}': неизвестные дни недели {', '.join(sorted(unknown_days))}"
+            )
+        if any(subject is None for subject in columns["subject_name"]):
+            errors.append(f"'{group_name}': есть занятия без названия предмета")
+
+    if errors:
+        raise ValueError("Расписание не прошло проверку: " + "; ".join(errors))
+
+
+def hash_sheet(columns: SheetColumns) -> str:
+    """
+    Вычисление хеша содержимого листа.
+
+    Args:
+        columns (SheetColumns): Данные листа по столбцам.
+
+    Returns:
+        str: Шестнадцатеричный SHA-256 от значений обязательных столбцов.
+    """
+    content = repr([columns[col] for col in REQUIRED_COLUMNS])
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PreparedWorkbook:
+    """
+    Проверенные данные книги Excel вместе с хешами листов.
+    """
+
+    data: Dict[str, SheetColumns]
+    hashes: Dict[str, str]
+    rejected_emails: List[str] = field(default_factory=list)
+
+
+def hash_workbook(source: Union[bytes, str]) -> str:
+    """
+    Вычисление хеша файла Excel без чтения его в память целиком.
+
+    Args:
+        source (Union[bytes, str]): Двоичные данные или путь к файлу Excel.
+
+    Returns:
+        str: Шестнадцатеричный SHA-256 содержимого файла.
+    """
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, "rb") as file:
+        for chunk in iter(lambda: file.read(2**20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def prepare_workbook(source: Union[bytes, str]) -> PreparedWorkbook:
+    """
+    Разбор, проверка и хеширование книги Excel.
+
+    Выполняется в пуле процессов, поэтому в цикл событий возвращаются уже
+    готовые столбцы данных. Адреса электронной почты проверяются,
+    нормализуются и очищаются от повторов внутри группы здесь же, один раз
+    на загрузку: на месте отброшенных адресов в столбце остаётся None.
+
+    Args:
+        source (Union[bytes, str]): Двоичные данные или путь к файлу Excel.
+
+    Returns:
+        PreparedWorkbook: Данные листов, их хеши и отклонённые адреса.
+    """
+    data = ExcelParser.parse_excel(source)
+    validate_schedule_data(data)
+    rejected_emails = []
+    for group_name, columns in data.items():
+        columns["email"], rejected = normalize_emails(columns["email"])
+        rejected_emails.extend(f"{group_name}: {email}" for email in rejected)
+    hashes = {name: hash_sheet(columns) for name, columns in data.items()}
+    return PreparedWorkbook(data=data, hashes=hashes, rejected_emails=rejected_emails)
+
+
+def build_import_batches(
+    data: Dict[str, SheetColumns],
+    hashes: Dict[str, str],
+    group_ids: Optional[Dict[str, int]] = None,
+    first_schedule_id: int = 1,
+) -> ImportBatches:
+    """
+    Подготовка строк для вставки из данных листов, разложенных по столбцам.
+
+    Идентификаторы групп и расписаний назначаются заранее, поэтому строки
+    всех таблиц можно вставить пакетно через executemany.
+
+    Args:
+        data (Dict[str, SheetColumns]): Данные листов Excel.
+        hashes (Dict[str, str]): Хеши листов по их названию.
+        group_ids (Optional[Dict[str, int]]): Идентификаторы групп по названию листа.
+            По умолчанию группы нумеруются с единицы в порядке листов.
+        first_schedule_id (int): Идентификатор первой вставляемой строки расписания.
+
+    Returns:
+        ImportBatches: Строки для таблиц Groups, Schedule, Subjects и Emails.
+    """
+    if group_ids is None:
+        group_ids = {name: group_id for group_id, name in enumerate(data, start=1)}
+    batches = ImportBatches()
+    schedule_id = first_schedule_id - 1
+    for group_name, columns in data.items():
+        group_id = group_ids[group_name]
+        batches.groups.append(
+            (group_id, group_name, hashes[group_name], normalize_group_name(group_name))
         )
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS Schedule (
-                schedule_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                group_id INT,
-                day_of_week VARCHAR(20),
-                FOREIGN KEY (group_id) REFERENCES Groups(group_id)
-            );
-            """
+
+        batches.emails.extend(
+            (group_id, email, last_name, first_name)
+            for email, last_name, first_name in zip(
+                columns["email"], columns["last_name"], columns["first_name"]
+            )
+            if email is not None and last_name is not None and first_name is not None
         )
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS Subjects (
-                subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                schedule_id INT,
-                subject_name VARCHAR(100),
-                start_time TIME,
-                end_time TIME,
-                location VARCHAR(100),
-                FOREIGN KEY (schedule_id) REFERENCES Schedule(schedule_id)
-            );
-            """
+
+        days = columns["day_of_week"]
+        schedule_ids = range(schedule_id + 1, schedule_id + len(days) + 1)
+        schedule_id += len(days)
+        batches.schedule.extend(
+            zip(
+                schedule_ids,
+                [group_id] * len(days),
+                days,
+                [get_day_index(day) for day in days],
+            )
         )
-        await conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS Emails (
-                email_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                group_id INT,
-                email VARCHAR(100),
-                last_name VARCHAR(100),
-                first_name VARCHAR(100),
-                FOREIGN KEY (group_id) REFERENCES Groups(group_id)
-            );
-            """
+        batches.subjects.extend(
+            zip(
+                schedule_ids,
+                columns["subject_name"],
+                columns["start_time"],
+                columns["end_time"],
+                columns["location"],
+            )
         )
-        await conn.commit()
-        await conn.close()
-        print("Таблицы успешно созданы.")
+    return batches
+
 
-    async def clear_database(self) -> None:
+async def record_import(
+    conn: Connection, workbook_hash: str, file_unique_id: Optional[str] = None
+) -> None:
+    """
+    Запись сведений о загруженном файле в историю загрузок.
+
+    Args:
+        conn (Connection): Соединение внутри транзакции импорта.
+        workbook_hash (str): Хеш загруженного файла.
+        file_unique_id (Optional[str]): Постоянный идентификатор файла в Telegram.
+    """
+    await conn.execute(
+        "INSERT INTO Imports (file_unique_id, workbook_hash) VALUES (?, ?)",
+        (file_unique_id, workbook_hash),
+    )
+
+
+# Запросы чтения ScheduleDB. Их планы проверяет benchmarks/check_query_plans.py
+GET_GROUP_SQL = "SELECT group_id FROM Groups WHERE group_name_norm = ?"
+GET_ALL_GROUPS_SQL = "SELECT group_name FROM Groups"
+GET_SCHEDULE_SQL = (
+    "SELECT schedule_id FROM Schedule WHERE group_id = ? AND day_of_week = ?"
+)
+GET_EMAILS_BY_GROUP_SQL = "SELECT email FROM Emails WHERE group_id = ?"
+GET_WEEKLY_SCHEDULE_SQL = """
+    SELECT s.day_of_week, sub.subject_name, sub.start_time, sub.end_time, sub.location
+    FROM Schedule AS s
+    JOIN Subjects AS sub ON sub.schedule_id = s.schedule_id
+    WHERE s.group_id = (
+        SELECT group_id FROM Groups WHERE group_name_norm = ?
+    )
+    AND s.day_index IS NOT NULL
+    ORDER BY s.day_index, sub.start_time, sub.subject_id
+"""
+GET_IMPORTED_GROUPS_SQL = "SELECT group_name, group_id, sheet_hash FROM Groups"
+GET_LAST_IMPORT_SQL = """
+    SELECT file_unique_id, workbook_hash FROM Imports
+    WHERE import_id = (SELECT MAX(import_id) FROM Imports)
+"""
+GET_GENERATION_SQL = "SELECT COALESCE(MAX(import_id), 0) FROM Imports"
+
+
+@registry.timed_methods("bot_db_seconds")
+class ScheduleDB:
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool] = None,
+        workers: Optional[WorkerPool] = None,
+    ) -> None:
         """
-        Очистка базы данных (удаление всех таблиц).
+        Args:
+            pool (Optional[ConnectionPool]): Пул соединений. По умолчанию
+                создаётся по настройкам из конфигурационного файла.
+            workers (Optional[WorkerPool]): Пул процессов для разбора файлов Excel.
+                По умолчанию создаётся по настройкам из конфигурационного файла.
         """
-        conn = await self.connect_to_db()
-        await conn.execute("DROP TABLE IF EXISTS Subjects")
-        await conn.execute("DROP TABLE IF EXISTS Schedule")
-        await conn.execute("DROP TABLE IF EXISTS Groups")
-        await conn.execute("DROP TABLE IF EXISTS Emails")
-        await conn.commit()
-        await conn.close()
+        if pool is None:
+            pool = ConnectionPool(
+                config.get_name_db(), readers=config.get_db_pool()["readers"]
+            )
+        if workers is None:
+            workers = WorkerPool(config.get_excel_import()["workers"])
+        self.pool = pool
+        self.workers = workers
+        # Поколение расписания: номер последней загрузки файла. Файл может
+        # загрузить другой процесс бота, поэтому номер перечитывается из базы
+        # не чаще раза в generation_ttl секунд
+        self.generation = 0
+        self._generation_checked_at: Optional[float] = None
+        self._import_lock = asyncio.Lock()
+        cache_settings = config.get_schedule_cache()
+        self.generation_ttl = cache_settings["generation_ttl"]
+        self.schedule_cache = LRUCache(
+            cache_settings["max_entries"], cache_settings["max_bytes"]
+        )
+
+    async def open(self) -> None:
+        """
+        Открытие пула соединений с базой данных и подготовка таблиц.
+        """
+        await self.pool.open()
+        await self.create_tables()
+        await self.current_generation(force=True)
+
+    async def close(self) -> None:
+        """
+        Закрытие пула соединений с базой данных и пула процессов.
+        """
+        self.workers.shutdown()
+        await self.pool.close()
+
+    async def create_tables(self) -> None:
+        """
+        Создание таблиц в базе данных и применение новых миграций схемы.
+        """
+        async with self.pool.write() as conn:
+            await migrations.migrate(conn)
+        print("Таблицы успешно созданы.")
 
     async def get_group(self, group_name: str) -> Union[int, None]:
         """
@@ -133,13 +503,11 @@ class ScheduleDB:
         Returns:
             Union[int, None]: Идентификатор группы или None, если группа не найдена.
         """
-        conn = await self.connect_to_db()
-        cursor = await conn.execute(
-            "SELECT group_id FROM Groups WHERE LOWER(group_name) = ?",
-            (group_name.lower(),),
-        )
-        group = await cursor.fetchone()
-        await conn.close()
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(
+                GET_GROUP_SQL, (normalize_group_name(group_name),)
+            )
+            group = await cursor.fetchone()
         return group[0] if group else None
 
     async def create_group(self, group_name: str) -> int:
@@ -152,27 +520,24 @@ class ScheduleDB:
         Returns:
             int: Идентификатор новой группы.
         """
-        conn = await self.connect_to_db()
-        cursor = await conn.execute(
-            "INSERT INTO Groups (group_name) VALUES (LOWER(?))", (group_name,)
-        )
-        await conn.commit()
-        last_row_id = cursor.lastrowid
-        await conn.close()
-        return last_row_id
+        async with self.pool.write() as conn:
+            cursor = await conn.execute(
+                "INSERT INTO Groups (group_name, group_name_norm) VALUES (?, ?)",
+                (group_name, normalize_group_name(group_name)),
+            )
+        return cursor.lastrowid
 
     async def get_all_groups(self) -> List[str]:
         """
         Получение всех групп из базы данных.
         """
-        conn = await self.connect_to_db()
-        cursor = await conn.execute("SELECT group_name FROM Groups")
-        groups = await cursor.fetchall()
-        await conn.close()
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(GET_ALL_GROUPS_SQL)
+            groups = await cursor.fetchall()
         return [group[0] for group in groups]
 
     async def get_schedule(
-            self, group_id: int, day_of_week: str
+        self, group_id: int, day_of_week: str
     ) -> Union[List[int], None]:
         """
         Получение идентификаторов расписаний для определенной группы и дня недели.
@@ -184,13 +549,9 @@ class ScheduleDB:
         Returns:
             Union[List[int], None]: Список идентификаторов расписаний или None, если расписание не найдено.
         """
-        conn = await self.connect_to_db()
-        cursor = await conn.execute(
-            "SELECT schedule_id FROM Schedule WHERE group_id = ? AND day_of_week = ?",
-            (group_id, day_of_week),
-        )
-        schedule = await cursor.fetchall()
-        await conn.close()
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(GET_SCHEDULE_SQL, (group_id, day_of_week))
+            schedule = await cursor.fetchall()
         return [row[0] for row in schedule] if schedule else None
 
     async def create_schedule(self, group_id: int, day_of_week: str) -> int:
@@ -204,23 +565,20 @@ class ScheduleDB:
         Returns:
             int: Идентификатор нового расписания.
         """
-        conn = await self.connect_to_db()
-        cursor = await conn.execute(
-            "INSERT INTO Schedule (group_id, day_of_week) VALUES (?, ?)",
-            (group_id, day_of_week),
-        )
-        await conn.commit()
-        last_row_id = cursor.lastrowid
-        await conn.close()
-        return last_row_id
+        async with self.pool.write() as conn:
+            cursor = await conn.execute(
+                "INSERT INTO Schedule (group_id, day_of_week, day_index) VALUES (?, ?, ?)",
+                (group_id, day_of_week, get_day_index(day_of_week)),
+            )
+        return cursor.lastrowid
 
     async def add_subject(
-            self,
-            schedule_id: int,
-            subject_name: str,
-            start_time: str,
-            end_time: str,
-            location: str,
+        self,
+        schedule_id: int,
+        subject_name: str,
+        start_time: str,
+        end_time: str,
+        location: str,
     ) -> int:
         """
         Добавление нового предмета в базу данных.
@@ -235,25 +593,22 @@ class ScheduleDB:
         Returns:
             int: Идентификатор нового предмета.
         """
-        conn = await self.connect_to_db()
-        cursor = await conn.execute(
-            """
-                INSERT INTO Subjects (schedule_id, subject_name, start_time, end_time, location) 
-                VALUES (?, ?, ?, ?, ?)
-            """,
-            (schedule_id, subject_name, start_time, end_time, location),
-        )
-        await conn.commit()
-        last_row_id = cursor.lastrowid
-        await conn.close()
-        return last_row_id
+        async with self.pool.write() as conn:
+            cursor = await conn.execute(
+                """
+                    INSERT INTO Subjects (schedule_id, subject_name, start_time, end_time, location) 
+                    VALUES (?, ?, ?, ?, ?)
+                """,
+                (schedule_id, subject_name, start_time, end_time, location),
+            )
+        return cursor.lastrowid
 
     async def add_email(
-            self,
-            group_id: int,
-            email: str,
-            last_name: str,
-            first_name: str,
+        self,
+        group_id: int,
+        email: str,
+        last_name: str,
+        first_name: str,
     ) -> int:
         """
         Добавление нового email в базу данных.
@@ -266,24 +621,30 @@ class ScheduleDB:
 
         Returns:
             int: Идентификатор нового email.
+
+        Raises:
+            ValueError: Если адрес недопустим.
         """
-        conn = await self.connect_to_db()
-        cursor = await conn.execute(
-            """
-                INSERT INTO Emails (group_id, email, last_name, first_name) 
-                VALUES (?, ?, ?, ?)
-            """,
-            (group_id, email, last_name, first_name),
-        )
-        await conn.commit()
-        last_row_id = cursor.lastrowid
-        await conn.close()
-        return last_row_id
+        normalized = normalize_email(email)
+        if normalized is None:
+            raise ValueError(f"Недопустимый адрес электронной почты: {email}")
+        async with self.pool.write() as conn:
+            cursor = await conn.execute(
+                """
+                    INSERT INTO Emails (group_id, email, last_name, first_name) 
+                    VALUES (?, ?, ?, ?)
+                """,
+                (group_id, normalized, last_name, first_name),
+            )
+        return cursor.lastrowid
 
     async def get_emails_by_group(self, group_name: str) -> Union[List[str], None]:
         """
         Получение email адресов по названию группы.
 
+        Адреса проверяются и нормализуются при импорте, поэтому возвращаются
+        без повторной проверки.
+
         Args:
             group_name (str): Название группы.
 
@@ -294,14 +655,36 @@ class ScheduleDB:
         if group_id is None:
             return None
 
-        conn = await self.connect_to_db()
-        cursor = await conn.execute(
-            "SELECT email FROM Emails WHERE group_id = ?", (group_id,)
-        )
-        emails = await cursor.fetchall()
-        await conn.close()
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(GET_EMAILS_BY_GROUP_SQL, (group_id,))
+            emails = await cursor.fetchall()
         return [row[0] for row in emails] if emails else None
 
+    async def get_weekly_schedule(
+        self, group_name: str
+    ) -> Union[List[Tuple[str, str, str, str, str]], None]:
+        """
+        Получение всех занятий группы за неделю одним запросом.
+
+        Занятия упорядочены по номеру дня недели и времени начала.
+
+        Args:
+            group_name (str): Название группы.
+
+        Returns:
+            Union[List[Tuple[str, str, str, str, str]], None]: Список занятий в виде
+            (день, предмет, начало, конец, аудитория) или None, если группа не найдена.
+        """
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(
+                GET_WEEKLY_SCHEDULE_SQL, (normalize_group_name(group_name),)
+            )
+            lessons = await cursor.fetchall()
+        # Пустой результат не отличает группу без занятий от несуществующей
+        if not lessons and await self.get_group(group_name) is None:
+            return None
+        return lessons
+
     async def get_weekly_schedule_by_group(self, group_name: str) -> str:
         """
         Получение недельного расписания для определенной группы.
@@ -312,107 +695,387 @@ class ScheduleDB:
         Returns:
             str: Текстовое представление недельного расписания в виде таблицы.
         """
-        group_id = await self.get_group(group_name)
-        if group_id is None:
+        # Поколение запоминается до запроса: если во время запроса загрузят
+        # новый файл, результат попадёт в кэш под устаревшим ключом
+        key = (normalize_group_name(group_name), await self.current_generation())
+        rendered = self.schedule_cache.get(key)
+        if rendered is not None:
+            return rendered
+
+        lessons = await self.get_weekly_schedule(group_name)
+        if lessons is None:
             return "Такой группы не существует, введите другую"
-        days_of_week = [
-            "Понедельник",
-            "Вторник",
-            "Среда",
-            "Четверг",
-            "Пятница",
-            "Суббота",
-        ]
-        weekly_schedule = {}
-        conn = await self.connect_to_db()
-
-        for day in days_of_week:
-            schedule_ids = await self.get_schedule(group_id, day)
-            if schedule_ids is not None:
-                for schedule_id in schedule_ids:
-                    cursor = await conn.execute(
-                        """
-                        SELECT subject_name, start_time, end_time, location
-                        FROM Subjects
-                        WHERE schedule_id = ?
-                        """,
-                        (schedule_id,),
-                    )
-                    schedule = await cursor.fetchall()
-                    if day not in weekly_schedule:
-                        weekly_schedule[day] = []
-                    weekly_schedule[day].extend(schedule)
-        await conn.close()
-
-        sorted_schedule = {}
-        for day in days_of_week:
-            if day in weekly_schedule:
-                sorted_schedule[day] = sorted(weekly_schedule[day], key=lambda x: x[1])
-
-        table = pt.PrettyTable()
-        table.field_names = ["День", "Предмет", "Начало", "Конец", "Аудитория"]
-        for day, classes in sorted_schedule.items():
-            for subject, start, end, room in classes:
+
+        # prettytable импортируется при первой отрисовке, а не при запуске бота
+        import prettytable as pt
+
+        with registry.timer("bot_render_seconds"):
+            table = pt.PrettyTable()
+            table.field_names = ["День", "Предмет", "Начало", "Конец", "Аудитория"]
+            for day, subject, start, end, room in lessons:
                 table.add_row([day, subject, start, end, room])
+            rendered = f"```Расписание\n{table}\n```"
+        self.schedule_cache.put(key, rendered)
+        return rendered
+
+    async def warm_schedule_cache(self) -> None:
+        """
+        Заполнение кэша расписаний групп текущего поколения (не больше,
+        чем помещается в кэш).
+        """
+        groups = await self.get_all_groups()
+        for group_name in groups[: self.schedule_cache.max_entries]:
+            await self.get_weekly_schedule_by_group(group_name)
+
+    async def get_imported_groups(self) -> Dict[str, Tuple[int, Optional[str]]]:
+        """
+        Получение загруженных групп вместе с хешами их листов.
+
+        Returns:
+            Dict[str, Tuple[int, Optional[str]]]: Идентификатор группы и хеш листа
+            по названию группы.
+        """
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(GET_IMPORTED_GROUPS_SQL)
+            rows = await cursor.fetchall()
+        return {name: (group_id, sheet_hash) for name, group_id, sheet_hash in rows}
+
+    async def get_last_import(self) -> Union[Tuple[Optional[str], str], None]:
+        """
+        Получение сведений о последнем загруженном файле.
+
+        Returns:
+            Union[Tuple[Optional[str], str], None]: Идентификатор файла в Telegram
+            и хеш файла или None, если файлы ещё не загружались.
+        """
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(GET_LAST_IMPORT_SQL)
+            return await cursor.fetchone()
+
+    async def get_generation(self) -> int:
+        """
+        Получение поколения расписания (номера последней загрузки файла).
+
+        Returns:
+            int: Номер последней загрузки или 0, если файлы не загружались.
+        """
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(GET_GENERATION_SQL)
+            return (await cursor.fetchone())[0]
+
+    async def current_generation(self, force: bool = False) -> int:
+        """
+        Поколение расписания с проверкой базы не чаще раза в ``generation_ttl`` секунд.
+
+        Если поколение изменилось (в том числе после загрузки файла другим
+        процессом бота), кэш отрисованных расписаний очищается.
+
+        Args:
+            force (bool): Прочитать поколение из базы, не дожидаясь истечения ttl.
+
+        Returns:
+            int: Номер последней загрузки файла.
+        """
+        now = time.monotonic()
+        checked_at = self._generation_checked_at
+        fresh = checked_at is not None and now - checked_at < self.generation_ttl
+        if not force and fresh:
+            return self.generation
+        # Отметка ставится до запроса, чтобы одновременные проверки не шли в базу все разом
+        self._generation_checked_at = now
+        generation = await self.get_generation()
+        if generation != self.generation:
+            self.generation = generation
+            self.schedule_cache.clear()
+        return generation
+
+    async def is_same_upload(self, file_unique_id: str) -> bool:
+        """
+        Проверка, что файл с таким идентификатором уже загружен последним.
+
+        Позволяет не скачивать повторно отправленный файл.
+
+        Args:
+            file_unique_id (str): Постоянный идентификатор файла в Telegram.
 
-        return f"```Расписание\n{table}\n```"
+        Returns:
+            bool: True, если последним был загружен этот же файл.
+        """
+        last_import = await self.get_last_import()
+        return last_import is not None and last_import[0] == file_unique_id
 
-    async def insert_data_from_excel(self, excel_bytes: bytes) -> None:
+    async def insert_data_from_excel(
+        self, source: Union[bytes, str], file_unique_id: Optional[str] = None
+    ) -> ImportReport:
         """
         Вставка данных из файла Excel в базу данных.
 
+        Для каждого листа хранится хеш содержимого. Если файл не изменился,
+        импорт пропускается, иначе перезаписываются только группы с
+        изменившимися листами, новые группы добавляются, а группы без листа
+        удаляются. Все изменения фиксируются одной транзакцией.
+
+        Если в базе ещё нет хешей (первая загрузка), новое расписание
+        собирается в теневых таблицах и атомарно подменяет текущее.
+        Читатели в любом случае видят либо полностью старое, либо полностью
+        новое расписание, а при ошибке текущее расписание остаётся нетронутым.
+        Одновременно отправленные файлы загружаются по очереди.
+
         Args:
-            excel_bytes (bytes): Двоичные данные файла Excel.
+            source (Union[bytes, str]): Двоичные данные или путь к файлу Excel.
+                Путь предпочтительнее: файл читается с диска частями и не
+                копируется целиком ни в память бота, ни в процесс разбора.
+            file_unique_id (Optional[str]): Постоянный идентификатор файла в Telegram.
+
+        Returns:
+            ImportReport: Количество вставленных строк, изменения по группам и
+            время этапов импорта.
         """
-        await self.clear_database()
-        await self.create_tables()
-        data = ExcelParser.parse_excel(excel_bytes)
-        conn = await self.connect_to_db()
+        # Загрузки выполняются по одной: иначе теневые таблицы и история
+        # загрузок одной загрузки перемешиваются с данными другой
+        async with self._import_lock:
+            started = time.perf_counter()
+            workbook_hash = await asyncio.to_thread(hash_workbook, source)
+            existing = await self.get_imported_groups()
+            last_import = await self.get_last_import()
+            if last_import is not None and last_import[1] == workbook_hash:
+                return ImportReport(
+                    groups=0,
+                    lessons=0,
+                    emails=0,
+                    parse_seconds=time.perf_counter() - started,
+                    insert_seconds=0.0,
+                    swap_seconds=0.0,
+                    unchanged=len(existing),
+                    skipped=True,
+                )
 
-        for group_name, df in data.items():
-            cursor = await conn.execute(
-                "INSERT INTO Groups (group_name) VALUES (?)", (group_name,)
+            # Разбор идёт в пуле процессов, поэтому время замеряется здесь, а не в parse_excel
+            with registry.timer("bot_excel_parse_seconds"):
+                prepared = await self.workers.run(prepare_workbook, source)
+            data, hashes = prepared.data, prepared.hashes
+            changed = {
+                name: columns
+                for name, columns in data.items()
+                if name not in existing or existing[name][1] != hashes[name]
+            }
+            removed = [name for name in existing if name not in data]
+            updated = [name for name in changed if name in existing]
+            parsed = time.perf_counter()
+
+            if existing and all(sheet_hash for _, sheet_hash in existing.values()):
+                batches = await self.apply_changed_groups(
+                    changed,
+                    hashes,
+                    [existing[name][0] for name in updated + removed],
+                    {name: existing[name][0] for name in updated},
+                    workbook_hash,
+                    file_unique_id,
+                )
+                staged = finished = time.perf_counter()
+            else:
+                batches = build_import_batches(data, hashes)
+                await self.build_staging_tables(batches)
+                staged = time.perf_counter()
+                await self.swap_staging_tables(batches, workbook_hash, file_unique_id)
+                finished = time.perf_counter()
+
+            # Новое поколение делает недействительными все отрисованные расписания
+            await self.current_generation(force=True)
+            await self.warm_schedule_cache()
+
+            return ImportReport(
+                groups=len(batches.groups),
+                lessons=len(batches.subjects),
+                emails=len(batches.emails),
+                parse_seconds=parsed - started,
+                insert_seconds=staged - parsed,
+                swap_seconds=finished - staged,
+                unchanged=len(data) - len(changed),
+                updated=len(updated),
+                added=len(changed) - len(updated),
+                removed=len(removed),
+                rejected_emails=prepared.rejected_emails,
             )
-            group_id = cursor.lastrowid
 
-            # Вставка данных в таблицу Emails
-            for _, row in df.iterrows():
-                email = row["email"]
-                last_name = row["last_name"]
-                first_name = row["first_name"]
+    async def apply_changed_groups(
+        self,
+        changed: Dict[str, SheetColumns],
+        hashes: Dict[str, str],
+        stale_group_ids: List[int],
+        kept_group_ids: Dict[str, int],
+        workbook_hash: str,
+        file_unique_id: Optional[str] = None,
+    ) -> ImportBatches:
+        """
+        Перезапись только изменившихся групп одной транзакцией.
 
-                if pd.notna(email) and pd.notna(last_name) and pd.notna(first_name):
-                    await conn.execute(
-                        """
-                        INSERT INTO Emails (group_id, email, last_name, first_name) 
-                        VALUES (?, ?, ?, ?)
-                        """,
-                        (group_id, email, last_name, first_name),
-                    )
-            for index, row in df.iterrows():
-                # Вставка данных в таблицу Schedule
-                day_of_week = row["day_of_week"]
-                cursor = await conn.execute(
-                    "INSERT INTO Schedule (group_id, day_of_week) VALUES (?, ?)",
-                    (group_id, day_of_week),
-                )
-                schedule_id = cursor.lastrowid
+        Args:
+            changed (Dict[str, SheetColumns]): Данные изменившихся и новых листов.
+            hashes (Dict[str, str]): Хеши листов по их названию.
+            stale_group_ids (List[int]): Группы, строки которых нужно удалить
+                (изменившиеся и исчезнувшие из файла).
+            kept_group_ids (Dict[str, int]): Идентификаторы, сохраняемые за
+                изменившимися группами.
+            workbook_hash (str): Хеш загруженного файла.
+            file_unique_id (Optional[str]): Постоянный идентификатор файла в Telegram.
+
+        Returns:
+            ImportBatches: Вставленные строки.
+        """
+        async with self.pool.write() as conn:
+            cursor = await conn.execute("""
+                SELECT (SELECT COALESCE(MAX(group_id), 0) FROM Groups),
+                       (SELECT COALESCE(MAX(schedule_id), 0) FROM Schedule)
+                """)
+            last_group_id, last_schedule_id = await cursor.fetchone()
+            group_ids = dict(kept_group_ids)
+            for name in changed:
+                if name not in group_ids:
+                    last_group_id += 1
+                    group_ids[name] = last_group_id
+            batches = build_import_batches(
+                changed, hashes, group_ids, last_schedule_id + 1
+            )
 
-                # Вставка данных в таблицу Subjects
-                start_time = row["start_time"].strftime("%H:%M:%S")
-                end_time = row["end_time"].strftime("%H:%M:%S")
-                location = row["location"]
-                subject_name = row["subject_name"]
+            if stale_group_ids:
+                placeholders = ", ".join("?" * len(stale_group_ids))
                 await conn.execute(
-                    """
-                    INSERT INTO Subjects (schedule_id, subject_name, start_time, end_time, location) 
-                    VALUES (?, ?, ?, ?, ?)
+                    f"""
+                    DELETE FROM Subjects WHERE schedule_id IN (
+                        SELECT schedule_id FROM Schedule WHERE group_id IN ({placeholders})
+                    )
                     """,
-                    (schedule_id, subject_name, start_time, end_time, location),
+                    stale_group_ids,
                 )
+                for table in ("Schedule", "Emails", "Groups"):
+                    await conn.execute(
+                        f"DELETE FROM {table} WHERE group_id IN ({placeholders})",
+                        stale_group_ids,
+                    )
+
+            await conn.executemany(
+                """
+                INSERT INTO Groups (group_id, group_name, sheet_hash, group_name_norm)
+                VALUES (?, ?, ?, ?)
+                """,
+                batches.groups,
+            )
+            await conn.executemany(
+                """
+                INSERT INTO Emails (group_id, email, last_name, first_name) 
+                VALUES (?, ?, ?, ?)
+                """,
+                batches.emails,
+            )
+            await conn.executemany(
+                """
+                INSERT INTO Schedule (schedule_id, group_id, day_of_week, day_index) 
+                VALUES (?, ?, ?, ?)
+                """,
+                batches.schedule,
+            )
+            await conn.executemany(
+                """
+                INSERT INTO Subjects (schedule_id, subject_name, start_time, end_time, location) 
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                batches.subjects,
+            )
+            await record_import(conn, workbook_hash, file_unique_id)
+        return batches
+
+    async def build_staging_tables(self, batches: ImportBatches) -> None:
+        """
+        Заполнение теневых таблиц новым расписанием.
+
+        Основные таблицы при этом не меняются. Строки вставляются пакетами
+        через executemany, индексы не создаются до подмены таблиц.
+
+        Args:
+            batches (ImportBatches): Строки для вставки.
+        """
+        suffix = migrations.STAGING_SUFFIX
+        async with self.pool.write() as conn:
+            for name in migrations.SCHEDULE_TABLES:
+                await conn.execute(f"DROP TABLE IF EXISTS {name}{suffix}")
+            await migrations.create_schedule_tables(conn, suffix)
+            await conn.executemany(
+                f"""
+                INSERT INTO Groups{suffix} (group_id, group_name, sheet_hash, group_name_norm)
+                VALUES (?, ?, ?, ?)
+                """,
+                batches.groups,
+            )
+            await conn.executemany(
+                f"""
+                INSERT INTO Emails{suffix} (group_id, email, last_name, first_name) 
+                VALUES (?, ?, ?, ?)
+                """,
+                batches.emails,
+            )
+            await conn.executemany(
+                f"""
+                INSERT INTO Schedule{suffix} (schedule_id, group_id, day_of_week, day_index) 
+                VALUES (?, ?, ?, ?)
+                """,
+                batches.schedule,
+            )
+            await conn.executemany(
+                f"""
+                INSERT INTO Subjects{suffix} (schedule_id, subject_name, start_time, end_time, location) 
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                batches.subjects,
+            )
+
+    async def swap_staging_tables(
+        self,
+        batches: ImportBatches,
+        workbook_hash: str,
+        file_unique_id: Optional[str] = None,
+    ) -> None:
+        """
+        Проверка теневых таблиц и их атомарная подмена основных.
+
+        Args:
+            batches (ImportBatches): Строки, которые должны оказаться в теневых таблицах.
+            workbook_hash (str): Хеш загруженного файла.
+            file_unique_id (Optional[str]): Постоянный идентификатор файла в Telegram.
+
+        Raises:
+            RuntimeError: Если содержимое теневых таблиц не совпадает с ожидаемым.
+        """
+        suffix = migrations.STAGING_SUFFIX
+        expected = {
+            "Groups": len(batches.groups),
+            "Schedule": len(batches.schedule),
+            "Subjects": len(batches.subjects),
+            "Emails": len(batches.emails),
+        }
+        async with self.pool.write() as conn:
+            for name, count in expected.items():
+                cursor = await conn.execute(f"SELECT COUNT(*) FROM {name}{suffix}")
+                actual = (await cursor.fetchone())[0]
+                if actual != count:
+                    raise RuntimeError(
+                        f"В теневой таблице {name} {actual} строк вместо {count}"
+                    )
+            cursor = await conn.execute(f"""
+                SELECT COUNT(*) FROM Subjects{suffix} AS sub
+                LEFT JOIN Schedule{suffix} AS s ON s.schedule_id = sub.schedule_id
+                WHERE s.schedule_id IS NULL
+                """)
+            if (await cursor.fetchone())[0]:
+                raise RuntimeError("В теневых таблицах есть занятия без расписания")
 
-        await conn.commit()
-        await conn.close()
+            for name in migrations.SCHEDULE_TABLES:
+                await conn.execute(f"DROP TABLE IF EXISTS {name}")
+            for name in migrations.SCHEDULE_TABLES:
+                await conn.execute(f"ALTER TABLE {name}{suffix} RENAME TO {name}")
+            await migrations.create_indexes(conn)
+            await migrations.create_unique_indexes(conn)
+            await record_import(conn, workbook_hash, file_unique_id)
 
 
 db = ScheduleDB()
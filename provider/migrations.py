@@ -0,0 +1,352 @@
+import re
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from aiosqlite import Connection
+
+# Вторичные индексы для горячих запросов ScheduleDB
+INDEXES: Tuple[Tuple[str, str], ...] = (
+    ("idx_schedule_group_day", "Schedule (group_id, day_of_week)"),
+    ("idx_subjects_schedule", "Subjects (schedule_id, start_time)"),
+    ("idx_emails_group", "Emails (group_id)"),
+)
+
+# Уникальные индексы. Создаются миграцией 10, потому что столбца
+# group_name_norm нет в таблицах, созданных до неё
+UNIQUE_INDEXES: Tuple[Tuple[str, str], ...] = (
+    ("idx_groups_name_norm", "Groups (group_name_norm)"),
+)
+
+
+# Таблицы расписания: название -> определение столбцов
+SCHEDULE_TABLES: Dict[str, str] = {
+    "Groups": """
+        group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        group_name VARCHAR(50),
+        sheet_hash CHAR(64),
+        group_name_norm VARCHAR(50)
+    """,
+    "Schedule": """
+        schedule_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        group_id INT,
+        day_of_week VARCHAR(20),
+        day_index INTEGER,
+        FOREIGN KEY (group_id) REFERENCES Groups(group_id)
+    """,
+    "Subjects": """
+        subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        schedule_id INT,
+        subject_name VARCHAR(100),
+        start_time TIME,
+        end_time TIME,
+        location VARCHAR(100),
+        FOREIGN KEY (schedule_id) REFERENCES Schedule(schedule_id)
+    """,
+    "Emails": """
+        email_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        group_id INT,
+        email VARCHAR(100),
+        last_name VARCHAR(100),
+        first_name VARCHAR(100),
+        FOREIGN KEY (group_id) REFERENCES Groups(group_id)
+    """,
+}
+
+# Суффикс теневых таблиц, в которых собирается новое расписание
+STAGING_SUFFIX = "_staging"
+
+
+async def create_schedule_tables(conn: Connection, suffix: str = "") -> None:
+    """
+    Создание таблиц расписания.
+
+    Внешние ключи всегда ссылаются на основные таблицы, поэтому теневые
+    таблицы после переименования становятся точной копией основных.
+
+    Args:
+        conn (Connection): Соединение с базой данных.
+        suffix (str): Суффикс имён таблиц, например для теневых таблиц.
+    """
+    for name, columns in SCHEDULE_TABLES.items():
+        await conn.execute(f"CREATE TABLE IF NOT EXISTS {name}{suffix} ({columns})")
+
+
+async def create_tables(conn: Connection) -> None:
+    """
+    Создание основных таблиц расписания.
+    """
+    await create_schedule_tables(conn)
+
+
+async def add_day_index(conn: Connection) -> None:
+    """
+    Добавление столбца day_index в таблицы, созданные до его появления.
+    """
+    # Список дней зафиксирован в миграции, чтобы она не зависела от
+    # последующих изменений кода
+    days_of_week = (
+        "Понедельник",
+        "Вторник",
+        "Среда",
+        "Четверг",
+        "Пятница",
+        "Суббота",
+    )
+    cursor = await conn.execute("PRAGMA table_info(Schedule)")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if "day_index" not in columns:
+        await conn.execute("ALTER TABLE Schedule ADD COLUMN day_index INTEGER")
+        await conn.executemany(
+            "UPDATE Schedule SET day_index = ? WHERE day_of_week = ?",
+            enumerate(days_of_week),
+        )
+
+
+async def add_import_tracking(conn: Connection) -> None:
+    """
+    Хранение хешей листов и истории загрузок для повторного импорта.
+    """
+    cursor = await conn.execute("PRAGMA table_info(Groups)")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if "sheet_hash" not in columns:
+        await conn.execute("ALTER TABLE Groups ADD COLUMN sheet_hash CHAR(64)")
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS Imports (
+            import_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_unique_id VARCHAR(100),
+            workbook_hash CHAR(64),
+            imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """)
+
+
+async def create_mail_outbox(conn: Connection) -> None:
+    """
+    Очередь исходящих писем: рассылки и по одной строке на адресата.
+    """
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS Mailings (
+            mailing_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_name VARCHAR(50),
+            theme VARCHAR(200),
+            text TEXT,
+            created_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS Outbox (
+            message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            mailing_id INT,
+            recipient VARCHAR(100),
+            status VARCHAR(10) DEFAULT 'pending',
+            attempts INT DEFAULT 0,
+            next_attempt_at REAL DEFAULT 0,
+            last_error TEXT,
+            FOREIGN KEY (mailing_id) REFERENCES Mailings(mailing_id)
+        );
+        """)
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_outbox_due ON Outbox (status, next_attempt_at)"
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_outbox_mailing ON Outbox (mailing_id, status)"
+    )
+
+
+async def add_outbox_sent_at(conn: Connection) -> None:
+    """
+    Время отправки письма для учёта суточной квоты почтового сервиса.
+    """
+    cursor = await conn.execute("PRAGMA table_info(Outbox)")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if "sent_at" not in columns:
+        await conn.execute("ALTER TABLE Outbox ADD COLUMN sent_at REAL")
+
+
+async def normalize_stored_emails(conn: Connection) -> None:
+    """
+    Удаление недопустимых и повторных адресов, сохранённых до проверки при импорте.
+    """
+    # Правило проверки зафиксировано в миграции, чтобы она не зависела от
+    # последующих изменений кода
+    email_regex = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+    cursor = await conn.execute(
+        "SELECT email_id, group_id, email FROM Emails ORDER BY email_id"
+    )
+    seen = set()
+    updates, deletes = [], []
+    for email_id, group_id, email in await cursor.fetchall():
+        email = str(email).strip() if email is not None else ""
+        if email_regex.fullmatch(email) is None:
+            deletes.append((email_id,))
+            continue
+        local, domain = email.rsplit("@", 1)
+        email = f"{local}@{domain.lower()}"
+        if (group_id, email.lower()) in seen:
+            deletes.append((email_id,))
+            continue
+        seen.add((group_id, email.lower()))
+        updates.append((email, email_id))
+    await conn.executemany("UPDATE Emails SET email = ? WHERE email_id = ?", updates)
+    await conn.executemany("DELETE FROM Emails WHERE email_id = ?", deletes)
+
+
+async def create_fsm_storage(conn: Connection) -> None:
+    """
+    Таблица состояний FSM пользователей, переживающих перезапуск бота.
+    """
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS FSMStorage (
+            chat_id VARCHAR(32),
+            user_id VARCHAR(32),
+            state VARCHAR(100),
+            data TEXT,
+            bucket TEXT,
+            updated_at REAL,
+            PRIMARY KEY (chat_id, user_id)
+        );
+        """)
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fsm_updated ON FSMStorage (updated_at)"
+    )
+
+
+async def create_admins(conn: Connection) -> None:
+    """
+    Таблица администраторов и счётчик её изменений.
+
+    Счётчик увеличивается триггерами в той же транзакции, что и изменение
+    списка, поэтому процессы бота узнают об изменениях одним чтением
+    счётчика, не перечитывая весь список.
+    """
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS Admins (
+            user_id INTEGER PRIMARY KEY,
+            added_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS AdminsVersion (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        );
+        """)
+    await conn.execute(
+        "INSERT OR IGNORE INTO AdminsVersion (id, version) VALUES (1, 0)"
+    )
+    for event in ("INSERT", "DELETE"):
+        await conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS admins_version_{event.lower()}
+            AFTER {event} ON Admins
+            BEGIN
+                UPDATE AdminsVersion SET version = version + 1 WHERE id = 1;
+            END;
+            """)
+
+
+async def create_indexes(conn: Connection) -> None:
+    """
+    Создание вторичных индексов.
+    """
+    for name, definition in INDEXES:
+        await conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+async def create_unique_indexes(conn: Connection) -> None:
+    """
+    Создание уникальных индексов.
+    """
+    for name, definition in UNIQUE_INDEXES:
+        await conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+async def add_group_name_norm(conn: Connection) -> None:
+    """
+    Нормализованное название группы для поиска без учёта регистра.
+
+    Встроенная в SQLite функция LOWER меняет регистр только латинских
+    букв, поэтому индекс по LOWER(group_name) не находил группы с
+    кириллицей в названии. Столбец заполняется в Python.
+    """
+    cursor = await conn.execute("PRAGMA table_info(Groups)")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if "group_name_norm" not in columns:
+        await conn.execute("ALTER TABLE Groups ADD COLUMN group_name_norm VARCHAR(50)")
+    cursor = await conn.execute("SELECT group_id, group_name FROM Groups")
+    # Правило нормализации зафиксировано в миграции, чтобы она не зависела
+    # от последующих изменений кода
+    await conn.executemany(
+        "UPDATE Groups SET group_name_norm = ? WHERE group_id = ?",
+        [
+            (str(group_name).strip().lower(), group_id)
+            for group_id, group_name in await cursor.fetchall()
+        ],
+    )
+    await conn.execute("DROP INDEX IF EXISTS idx_groups_name_lower")
+    await create_unique_indexes(conn)
+
+
+# Упорядоченный список миграций: (версия схемы, описание, функция)
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], Awaitable[None]]]] = [
+    (1, "Создание таблиц расписания", create_tables),
+    (2, "Столбец day_index в таблице Schedule", add_day_index),
+    (3, "Индексы для запросов ScheduleDB", create_indexes),
+    (4, "Хеши листов и история загрузок", add_import_tracking),
+    (5, "Очередь исходящих писем", create_mail_outbox),
+    (6, "Время отправки писем из очереди", add_outbox_sent_at),
+    (7, "Проверка и нормализация сохранённых адресов", normalize_stored_emails),
+    (8, "Хранилище состояний FSM", create_fsm_storage),
+    (9, "Таблица администраторов", create_admins),
+    (10, "Нормализованное название группы", add_group_name_norm),
+]
+
+
+async def get_schema_version(conn: Connection) -> int:
+    """
+    Получение версии схемы, записанной в базе данных.
+
+    Args:
+        conn (Connection): Соединение с базой данных.
+
+    Returns:
+        int: Номер последней применённой миграции.
+    """
+    cursor = await conn.execute("PRAGMA user_version")
+    return (await cursor.fetchone())[0]
+
+
+async def set_schema_version(conn: Connection, version: int) -> None:
+    """
+    Запись версии схемы в базу данных.
+
+    Args:
+        conn (Connection): Соединение с базой данных.
+        version (int): Номер последней применённой миграции.
+    """
+    await conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+async def migrate(conn: Connection) -> List[int]:
+    """
+    Применение ещё не выполненных миграций по порядку.
+
+    Вызывается внутри транзакции на запись, поэтому миграции применяются
+    либо все вместе с записью новой версии, либо не применяются вовсе.
+    Каждая миграция идемпотентна и может безопасно выполниться повторно.
+
+    Args:
+        conn (Connection): Соединение с базой данных внутри транзакции.
+
+    Returns:
+        List[int]: Версии применённых миграций.
+    """
+    current = await get_schema_version(conn)
+    applied = []
+    for version, description, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        await migration(conn)
+        await set_schema_version(conn, version)
+        applied.append(version)
+        print(f"Применена миграция {version}: {description}")
+    return applied
@@ -0,0 +1,139 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+import aiosqlite
+from aiosqlite import Connection
+
+# Настройки, применяемые к каждому соединению пула
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=134217728",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class ConnectionPool:
+    """
+    Пул долгоживущих соединений с базой данных SQLite.
+
+    Держит одно соединение для записи и несколько соединений только для чтения.
+    Благодаря режиму WAL читатели не блокируются писателем и всегда видят
+    последнее зафиксированное состояние базы.
+    """
+
+    def __init__(self, database: str, readers: int = 4) -> None:
+        """
+        Args:
+            database (str): Путь к файлу базы данных.
+            readers (int): Количество соединений для чтения.
+        """
+        self.database = database
+        self.readers = max(1, readers)
+        self._writer: Optional[Connection] = None
+        self._reader_connections: List[Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Returns:
+            bool: True, если соединения пула открыты.
+        """
+        return self._writer is not None
+
+    async def _connect(self, read_only: bool) -> Connection:
+        """
+        Открывает соединение и применяет к нему настройки PRAGMA.
+
+        Args:
+            read_only (bool): Запретить запись через это соединение.
+
+        Returns:
+            Connection: Настроенное соединение.
+        """
+        conn = await aiosqlite.connect(self.database, isolation_level=None)
+        for pragma in PRAGMAS:
+            await conn.execute(pragma)
+        if read_only:
+            await conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    async def open(self) -> None:
+        """
+        Открывает соединение для записи и соединения для чтения.
+        Повторный вызов ничего не делает.
+        """
+        async with self._open_lock:
+            if self.is_open:
+                return
+            # Писатель открывается первым, чтобы перевести базу в режим WAL
+            writer = await self._connect(read_only=False)
+            idle_readers = asyncio.Queue()
+            for _ in range(self.readers):
+                conn = await self._connect(read_only=True)
+                self._reader_connections.append(conn)
+                idle_readers.put_nowait(conn)
+            self._idle_readers = idle_readers
+            self._writer = writer
+
+    async def close(self) -> None:
+        """
+        Дожидается возврата всех соединений в пул и закрывает их.
+        """
+        async with self._open_lock:
+            if not self.is_open:
+                return
+            async with self._write_lock:
+                for _ in range(len(self._reader_connections)):
+                    conn = await self._idle_readers.get()
+                    await conn.close()
+                await self._writer.close()
+            self._reader_connections = []
+            self._idle_readers = None
+            self._writer = None
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[Connection]:
+        """
+        Выдаёт свободное соединение для чтения на время блока ``async with``.
+
+        Yields:
+            Connection: Соединение только для чтения.
+        """
+        if not self.is_open:
+            await self.open()
+        idle_readers = self._idle_readers
+        conn = await idle_readers.get()
+        try:
+            yield conn
+        finally:
+            idle_readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[Connection]:
+        """
+        Выдаёт соединение для записи внутри транзакции.
+
+        Транзакция фиксируется при выходе из блока ``async with`` и
+        откатывается, если внутри блока возникло исключение.
+
+        Yields:
+            Connection: Соединение для записи.
+        """
+        if not self.is_open:
+            await self.open()
+        async with self._write_lock:
+            conn = self._writer
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                await conn.execute("ROLLBACK")
+                raise
+            await conn.execute("COMMIT")
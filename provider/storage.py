@@ -0,0 +1,279 @@
+import copy
+import json
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+from aiogram.dispatcher.storage import BaseStorage
+
+from provider.pool import ConnectionPool
+
+# Ключ записи: идентификаторы чата и пользователя в виде строк
+Address = Tuple[str, str]
+
+# Запросы по условию. Их планы проверяет benchmarks/check_query_plans.py
+LOAD_SQL = """
+    SELECT state, data, bucket, updated_at FROM FSMStorage
+    WHERE chat_id = ? AND user_id = ?
+"""
+DELETE_SQL = "DELETE FROM FSMStorage WHERE chat_id = ? AND user_id = ?"
+PURGE_EXPIRED_SQL = "DELETE FROM FSMStorage WHERE updated_at < ?"
+
+
+def empty_record() -> Dict[str, Any]:
+    return {"state": None, "data": {}, "bucket": {}, "updated_at": 0.0}
+
+
+def is_empty(record: Dict[str, Any]) -> bool:
+    return record["state"] is None and not record["data"] and not record["bucket"]
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Хранилище состояний FSM в базе данных SQLite бота.
+
+    Состояния, данные и bucket пользователей переживают перезапуск и
+    доступны нескольким процессам бота с общей базой. Каждая запись сразу
+    сохраняется в базу. По умолчанию чтения тоже идут в базу; кэш в памяти
+    (``cache_ttl`` > 0) допустим, только если бот работает одним процессом:
+    изменения, сделанные другим процессом, кэш не видит. Состояния,
+    не изменявшиеся дольше ``ttl`` секунд, считаются брошенными и удаляются.
+    """
+
+    def __init__(
+        self, pool: ConnectionPool, ttl: float = 86400.0, cache_ttl: float = 0.0
+    ) -> None:
+        """
+        Args:
+            pool (ConnectionPool): Пул соединений с базой данных.
+            ttl (float): Через сколько секунд без изменений состояние истекает.
+                0 — состояния не истекают.
+            cache_ttl (float): Сколько секунд запись в кэше считается актуальной.
+                0 — всегда читать из базы. Больше нуля — только для одного
+                процесса бота, иначе процесс может продолжить диалог по
+                устаревшему состоянию.
+        """
+        self.pool = pool
+        self.ttl = ttl
+        self.cache_ttl = cache_ttl
+        # Адрес -> (время загрузки в кэш, запись)
+        self._cache: Dict[Address, Tuple[float, Dict[str, Any]]] = {}
+
+    def resolve_address(
+        self, chat: Union[str, int, None], user: Union[str, int, None]
+    ) -> Address:
+        chat_id, user_id = map(str, self.check_address(chat=chat, user=user))
+        return chat_id, user_id
+
+    def is_expired(self, record: Dict[str, Any], now: float) -> bool:
+        updated_at = record["updated_at"]
+        return bool(self.ttl and updated_at and now - updated_at > self.ttl)
+
+    async def load(self, address: Address) -> Dict[str, Any]:
+        """
+        Получение записи пользователя из кэша или из базы данных.
+
+        Args:
+            address (Address): Идентификаторы чата и пользователя.
+
+        Returns:
+            Dict[str, Any]: Состояние, данные, bucket и время последнего изменения.
+        """
+        now = time.time()
+        cached = self._cache.get(address)
+        if cached is not None and now - cached[0] < self.cache_ttl:
+            record = cached[1]
+        else:
+            async with self.pool.read() as conn:
+                cursor = await conn.execute(LOAD_SQL, address)
+                row = await cursor.fetchone()
+            if row is None:
+                record = empty_record()
+            else:
+                state, data, bucket, updated_at = row
+                record = {
+                    "state": state,
+                    "data": json.loads(data),
+                    "bucket": json.loads(bucket),
+                    "updated_at": updated_at,
+                }
+            self._cache[address] = (now, record)
+        if self.is_expired(record, now):
+            record = empty_record()
+            self._cache[address] = (now, record)
+        return record
+
+    async def save(self, address: Address, record: Dict[str, Any]) -> None:
+        """
+        Сохранение записи пользователя в кэш и в базу данных.
+        Пустая запись удаляется.
+
+        Args:
+            address (Address): Идентификаторы чата и пользователя.
+            record (Dict[str, Any]): Состояние, данные и bucket.
+        """
+        empty = is_empty(record)
+        cached = self._cache.get(address)
+        if empty and cached is not None and is_empty(cached[1]):
+            # Сброс состояния, которого нет (например, отмена вне диалога)
+            return
+        now = time.time()
+        record["updated_at"] = now
+        async with self.pool.write() as conn:
+            if empty:
+                await conn.execute(DELETE_SQL, address)
+            else:
+                await conn.execute(
+                    """
+                    INSERT INTO FSMStorage (chat_id, user_id, state, data, bucket, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (chat_id, user_id) DO UPDATE SET
+                        state = excluded.state,
+                        data = excluded.data,
+                        bucket = excluded.bucket,
+                        updated_at = excluded.updated_at
+                    """,
+                    (
+                        *address,
+                        record["state"],
+                        json.dumps(record["data"], ensure_ascii=False),
+                        json.dumps(record["bucket"], ensure_ascii=False),
+                        now,
+                    ),
+                )
+        self._cache[address] = (now, empty_record() if empty else record)
+
+    async def purge_expired(self) -> int:
+        """
+        Удаление брошенных состояний из базы данных и из кэша.
+
+        Returns:
+            int: Число удалённых записей.
+        """
+        now = time.time()
+        self._cache = {
+            address: (loaded_at, record)
+            for address, (loaded_at, record) in self._cache.items()
+            if now - loaded_at < self.cache_ttl and not self.is_expired(record, now)
+        }
+        if not self.ttl:
+            return 0
+        async with self.pool.write() as conn:
+            cursor = await conn.execute(PURGE_EXPIRED_SQL, (now - self.ttl,))
+        return cursor.rowcount
+
+    async def close(self) -> None:
+        # Соединения принадлежат общему пулу базы данных и закрываются вместе с ним
+        self._cache.clear()
+
+    async def wait_closed(self) -> None:
+        pass
+
+    async def get_state(
+        self,
+        *,
+        chat: Union[str, int, None] = None,
+        user: Union[str, int, None] = None,
+        default: Optional[str] = None,
+    ) -> Optional[str]:
+        record = await self.load(self.resolve_address(chat, user))
+        if record["state"] is None:
+            return self.resolve_state(default)
+        return record["state"]
+
+    async def get_data(
+        self,
+        *,
+        chat: Union[str, int, None] = None,
+        user: Union[str, int, None] = None,
+        default: Optional[Dict] = None,
+    ) -> Dict:
+        record = await self.load(self.resolve_address(chat, user))
+        return copy.deepcopy(record["data"] or default or {})
+
+    async def set_state(
+        self,
+        *,
+        chat: Union[str, int, None] = None,
+        user: Union[str, int, None] = None,
+        state: Optional[str] = None,
+    ) -> None:
+        address = self.resolve_address(chat, user)
+        record = dict(await self.load(address), state=self.resolve_state(state))
+        await self.save(address, record)
+
+    async def set_data(
+        self,
+        *,
+        chat: Union[str, int, None] = None,
+        user: Union[str, int, None] = None,
+        data: Optional[Dict] = None,
+    ) -> None:
+        address = self.resolve_address(chat, user)
+        record = dict(await self.load(address), data=copy.deepcopy(data or {}))
+        await self.save(address, record)
+
+    async def update_data(
+        self,
+        *,
+        chat: Union[str, int, None] = None,
+        user: Union[str, int, None] = None,
+        data: Optional[Dict] = None,
+        **kwargs: Any,
+    ) -> None:
+        address = self.resolve_address(chat, user)
+        record = await self.load(address)
+        merged = copy.deepcopy(record["data"])
+        merged.update(data or {}, **kwargs)
+        await self.save(address, dict(record, data=merged))
+
+    async def reset_state(
+        self,
+        *,
+        chat: Union[str, int, None] = None,
+        user: Union[str, int, None] = None,
+        with_data: Optional[bool] = True,
+    ) -> None:
+        # Состояние и данные сбрасываются одной записью в базу
+        address = self.resolve_address(chat, user)
+        record = dict(await self.load(address), state=None)
+        if with_data:
+            record["data"] = {}
+        await self.save(address, record)
+
+    def has_bucket(self) -> bool:
+        return True
+
+    async def get_bucket(
+        self,
+        *,
+        chat: Union[str, int, None] = None,
+        user: Union[str, int, None] = None,
+        default: Optional[Dict] = None,
+    ) -> Dict:
+        record = await self.load(self.resolve_address(chat, user))
+        return copy.deepcopy(record["bucket"] or default or {})
+
+    async def set_bucket(
+        self,
+        *,
+        chat: Union[str, int, None] = None,
+        user: Union[str, int, None] = None,
+        bucket: Optional[Dict] = None,
+    ) -> None:
+        address = self.resolve_address(chat, user)
+        record = dict(await self.load(address), bucket=copy.deepcopy(bucket or {}))
+        await self.save(address, record)
+
+    async def update_bucket(
+        self,
+        *,
+        chat: Union[str, int, None] = None,
+        user: Union[str, int, None] = None,
+        bucket: Optional[Dict] = None,
+        **kwargs: Any,
+    ) -> None:
+        address = self.resolve_address(chat, user)
+        record = await self.load(address)
+        merged = copy.deepcopy(record["bucket"])
+        merged.update(bucket or {}, **kwargs)
+        await self.save(address, dict(record, bucket=merged))
@@ -0,0 +1,67 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+
+class WorkerPool:
+    """
+    Пул процессов для тяжёлой по CPU работы (разбор файлов Excel).
+
+    Работа выполняется вне процесса бота, поэтому цикл событий asyncio
+    продолжает обслуживать остальных пользователей. Процессы создаются
+    при первом использовании и переиспользуются между вызовами.
+    """
+
+    def __init__(self, workers: int = 1) -> None:
+        """
+        Args:
+            workers (int): Количество процессов. При 0 работа выполняется
+                прямо в текущем процессе.
+        """
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        """
+        Returns:
+            ProcessPoolExecutor: Пул процессов, созданный при первом обращении.
+        """
+        if self._executor is None:
+            # spawn не копирует в дочерний процесс потоки aiosqlite и состояние цикла
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Выполнение функции в процессе из пула.
+
+        Args:
+            func (Callable[..., Any]): Функция уровня модуля (должна сериализоваться pickle).
+            *args (Any): Аргументы функции.
+
+        Returns:
+            Any: Результат функции.
+        """
+        if self.workers <= 0:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.get_executor(), func, *args)
+        except BrokenProcessPool:
+            # Процесс аварийно завершился (например, из-за нехватки памяти),
+            # следующий вызов создаст пул заново
+            self.shutdown()
+            raise
+
+    def shutdown(self) -> None:
+        """
+        Остановка процессов пула.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,20 +1,213 @@
+import asyncio
+import os
+import signal
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, TypedDict
 
 import yaml
 
 path: Path = Path(__file__).resolve().parents[1] / "config.yaml"
 
 
-def read_yaml() -> Dict[str, Any]:
+class Settings(TypedDict):
     """
-    Читает YAML файл и возвращает его содержимое в виде словаря.
+    Разделы конфигурационного файла и их типы.
+    """
+
+    super_admin_add: Dict[str, str]
+    db_name: str
+    db_pool: Dict[str, int]
+    schedule_cache: Dict[str, Any]
+    excel_import: Dict[str, int]
+    smtp_pool: Dict[str, Any]
+    mail_outbox: Dict[str, Any]
+    mail_rate: Dict[str, Any]
+    webhook: Dict[str, Any]
+    fsm_storage: Dict[str, Any]
+    updates: Dict[str, int]
+    throttling: Dict[str, Any]
+    metrics: Dict[str, Any]
+    profiling: Dict[str, Any]
+    admins: Dict[str, float]
+
+
+def parse_settings(text: str) -> Settings:
+    """
+    Разбор и проверка содержимого конфигурационного файла.
+
+    Args:
+        text (str): Текст файла в формате YAML.
+
+    Returns:
+        Settings: Настройки по разделам.
+
+    Raises:
+        ValueError: Если YAML некорректен, раздела не хватает или его тип
+            не совпадает с описанным в Settings.
+    """
+    try:
+        # Разбор на C через libyaml, если PyYAML собран с ней
+        data = yaml.load(text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    except yaml.YAMLError as e:
+        raise ValueError(f"Некорректный YAML: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("Конфигурационный файл должен содержать словарь разделов")
+    for key, annotation in Settings.__annotations__.items():
+        if key not in data:
+            raise ValueError(f"Нет раздела {key}")
+        expected = getattr(annotation, "__origin__", annotation)
+        if not isinstance(data[key], expected):
+            raise ValueError(f"Раздел {key} должен иметь тип {expected.__name__}")
+    return data
+
+
+class ConfigFile:
+    """
+    Конфигурационный файл, прочитанный один раз и хранящийся в памяти.
+
+    Файл перечитывается, только когда изменилось время его модификации
+    (проверяется не чаще раза в ``check_interval`` секунд при чтении настроек
+    и фоновой задачей, запущенной через ``start``) или по сигналу SIGHUP.
+    Подписчики разделов получают новые значения изменившихся
+    разделов. Если новый файл некорректен, ошибка выводится в консоль,
+    а бот продолжает работать с прежними настройками.
+    """
+
+    def __init__(self, file_path: Path, check_interval: float = 1.0) -> None:
+        """
+        Args:
+            file_path (Path): Путь к файлу YAML.
+            check_interval (float): Как часто проверять время модификации файла, в секундах.
+        """
+        self.path = file_path
+        self.check_interval = check_interval
+        self._settings: Optional[Settings] = None
+        self._mtime = 0.0
+        self._checked_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        # Раздел -> функции, вызываемые с новым значением раздела
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = {}
+
+    def get(self) -> Settings:
+        """
+        Returns:
+            Settings: Текущие настройки. Словари общие для всех вызовов
+            и не должны изменяться.
+
+        Raises:
+            ValueError: Если файл некорректен при первом чтении.
+        """
+        now = time.monotonic()
+        if self._settings is None or now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            if self._settings is None or self.stat() != self._mtime:
+                self.reload()
+        return self._settings
+
+    def stat(self) -> float:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return self._mtime
+
+    def reload(self) -> bool:
+        """
+        Перечитывание файла и оповещение подписчиков изменившихся разделов.
+
+        Returns:
+            bool: True, если настройки применены, False, если файл некорректен
+            и остались прежние настройки.
+
+        Raises:
+            ValueError: Если файл некорректен, а прежних настроек нет.
+        """
+        mtime = self.stat()
+        try:
+            with open(self.path, "r") as file:
+                settings = parse_settings(file.read())
+        except (OSError, ValueError) as e:
+            if self._settings is None:
+                raise ValueError(f"Не удалось прочитать {self.path}: {e}") from e
+            # Повторно тот же файл не разбирается, пока его не изменят
+            self._mtime = mtime
+            print(f"Конфигурация не перезагружена, используются прежние настройки: {e}")
+            return False
+        previous, self._settings, self._mtime = self._settings, settings, mtime
+        if previous is not None:
+            for key, callbacks in self._subscribers.items():
+                if settings[key] != previous[key]:
+                    for callback in callbacks:
+                        callback(settings[key])
+        return True
+
+    def subscribe(self, key: str, callback: Callable[[Any], None]) -> None:
+        """
+        Подписка на изменения раздела конфигурации.
+
+        Args:
+            key (str): Раздел конфигурации.
+            callback (Callable[[Any], None]): Функция, получающая новое значение раздела.
+        """
+        self._subscribers.setdefault(key, []).append(callback)
+
+    def watch_sighup(self) -> None:
+        """
+        Перечитывание файла по сигналу SIGHUP (только в Unix).
+        Вызывается из работающего цикла событий.
+        """
+        if hasattr(signal, "SIGHUP"):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.reload)
+
+    async def watch(self) -> None:
+        """
+        Проверка времени модификации файла раз в ``check_interval`` секунд,
+        чтобы изменения доходили до подписчиков без обращений к настройкам.
+        Работает до отмены задачи.
+        """
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                self.get()
+            except Exception as e:
+                # Ошибка подписчика не должна останавливать проверку файла
+                print(f"Ошибка применения конфигурации: {e}")
+
+    def start(self) -> None:
+        """
+        Запуск фоновой проверки файла и перечитывания по SIGHUP.
+        Вызывается из работающего цикла событий.
+        """
+        self.watch_sighup()
+        if self._task is None:
+            self._task = asyncio.create_task(self.watch())
+
+    async def stop(self) -> None:
+        """
+        Остановка фоновой проверки файла.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+config_file = ConfigFile(path)
+
+
+def read_yaml() -> Settings:
+    """
+    Возвращает содержимое конфигурационного файла в виде словаря.
+
+    Файл разбирается один раз и перечитывается только после изменения.
 
     Returns:
-        Dict[str, Any]: Содержимое YAML файла в виде словаря.
+        Settings: Содержимое YAML файла в виде словаря.
     """
-    with open(path, "r") as file:
-        return yaml.safe_load(file)
+    return config_file.get()
 
 
 def super_admin_add() -> Dict[str, Any]:
@@ -35,3 +228,145 @@ def get_name_db() -> str:
         str: Строку с названием базы данных
     """
     return read_yaml()["db_name"]
+
+
+def get_db_pool() -> Dict[str, Any]:
+    """
+    Получает настройки пула соединений с базой данных.
+
+    Returns:
+        Dict[str, Any]: Словарь с настройками пула соединений.
+    """
+    return read_yaml()["db_pool"]
+
+
+def get_schedule_cache() -> Dict[str, Any]:
+    """
+    Получает настройки кэша отрисованных расписаний.
+
+    Returns:
+        Dict[str, Any]: Словарь с максимальным числом записей, размером кэша в байтах
+        и интервалом проверки поколения расписания в секундах.
+    """
+    return read_yaml()["schedule_cache"]
+
+
+def get_excel_import() -> Dict[str, Any]:
+    """
+    Получает настройки импорта расписания из файлов Excel.
+
+    Returns:
+        Dict[str, Any]: Словарь с настройками импорта (количество процессов разбора
+        и максимальный размер загружаемого файла в байтах).
+    """
+    return read_yaml()["excel_import"]
+
+
+def get_smtp_pool() -> Dict[str, Any]:
+    """
+    Получает настройки пула SMTP-сессий для рассылки писем.
+
+    Returns:
+        Dict[str, Any]: Словарь с размером пула и временем простоя в секундах,
+        после которого сессия проверяется командой NOOP.
+    """
+    return read_yaml()["smtp_pool"]
+
+
+def get_mail_outbox() -> Dict[str, Any]:
+    """
+    Получает настройки очереди исходящих писем.
+
+    Returns:
+        Dict[str, Any]: Словарь с размером пачки писем, числом попыток доставки,
+        начальной и максимальной задержкой повтора и интервалом опроса в секундах,
+        а также числом адресатов в одной SMTP-транзакции (1 — отдельное письмо
+        каждому, больше 1 — одно письмо со скрытыми адресатами).
+    """
+    return read_yaml()["mail_outbox"]
+
+
+def get_mail_rate() -> Dict[str, Any]:
+    """
+    Получает квоты почтового сервиса на отправку писем.
+
+    Returns:
+        Dict[str, Any]: Словарь с числом писем в секунду и в сутки (0 — без ограничения).
+    """
+    return read_yaml()["mail_rate"]
+
+
+def get_webhook() -> Dict[str, Any]:
+    """
+    Получает настройки режима webhook.
+
+    Returns:
+        Dict[str, Any]: Словарь с признаком включения, внешним адресом и путём webhook,
+        адресом и портом встроенного сервера.
+    """
+    return read_yaml()["webhook"]
+
+
+def get_fsm_storage() -> Dict[str, Any]:
+    """
+    Получает настройки хранилища состояний FSM.
+
+    Returns:
+        Dict[str, Any]: Словарь со временем жизни брошенных состояний и временем
+        актуальности записей кэша в секундах (кэш — только для одного процесса бота).
+    """
+    return read_yaml()["fsm_storage"]
+
+
+def get_updates() -> Dict[str, int]:
+    """
+    Получает настройки очереди обработки обновлений.
+
+    Returns:
+        Dict[str, int]: Словарь с числом одновременно обрабатываемых обновлений
+        и максимальным числом ожидающих обновлений.
+    """
+    return read_yaml()["updates"]
+
+
+def get_throttling() -> Dict[str, Any]:
+    """
+    Получает настройки ограничения частоты запросов к обработчикам.
+
+    Returns:
+        Dict[str, Any]: Словарь с интервалом очистки неактивных вёдер и ограничениями
+        по группам обработчиков: запросов в секунду и всплеск на пользователя и на всех.
+    """
+    return read_yaml()["throttling"]
+
+
+def get_metrics() -> Dict[str, Any]:
+    """
+    Получает настройки сервера метрик.
+
+    Returns:
+        Dict[str, Any]: Словарь с признаком включения, адресом и портом сервера метрик.
+    """
+    return read_yaml()["metrics"]
+
+
+def get_profiling() -> Dict[str, Any]:
+    """
+    Получает настройки профилирования медленных обновлений.
+
+    Returns:
+        Dict[str, Any]: Словарь с признаком включения при запуске, порогом длительности
+        в секундах, каталогом файлов профилей и числом хранимых файлов.
+    """
+    return read_yaml()["profiling"]
+
+
+def get_admins() -> Dict[str, float]:
+    """
+    Получает настройки реестра администраторов.
+
+    Returns:
+        Dict[str, float]: Словарь со временем в секундах, в течение которого список
+        администраторов в памяти не сверяется с базой данных.
+    """
+    return read_yaml()["admins"]
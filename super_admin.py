@@ -1,24 +1,68 @@
+import asyncio
 import json
+import os
+import time
+from typing import List, Optional, Set
+
+from provider import db
+from provider.pool import ConnectionPool
 from resources import config
 
-ADMINS_FILE = 'admins.json'
+# Прежний файл со списком администраторов; переносится в базу данных при запуске
+ADMINS_FILE = "admins.json"
+
+# Запросы чтения реестра. Их планы проверяет benchmarks/check_query_plans.py
+GET_VERSION_SQL = "SELECT version FROM AdminsVersion WHERE id = 1"
+GET_ADMINS_SQL = "SELECT user_id FROM Admins"
 
 
 class AdminManager:
-    def __init__(self):
-        self.admins = self.load_admins()
+    """
+    Реестр администраторов в базе данных бота.
 
-    @staticmethod
-    def load_admins() -> list:
-        try:
-            with open(ADMINS_FILE, 'r') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            return []
+    Список хранится в памяти множеством, поэтому проверка прав не обращается
+    к базе. Раз в ``ttl`` секунд читается счётчик изменений списка: если его
+    изменил другой процесс бота, список перечитывается целиком. Запись идёт
+    транзакцией через соединение на запись, вне цикла событий.
+    """
+
+    def __init__(self, pool: ConnectionPool, ttl: float = 5.0) -> None:
+        """
+        Args:
+            pool (ConnectionPool): Пул соединений с базой данных.
+            ttl (float): Как долго, в секундах, список в памяти считается актуальным
+                без проверки счётчика изменений.
+        """
+        self.pool = pool
+        self.ttl = ttl
+        self.admins: Set[int] = set()
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    async def refresh(self, force: bool = False) -> None:
+        """
+        Перечитывание списка администраторов, если он изменился.
 
-    def save_admins(self) -> None:
-        with open(ADMINS_FILE, 'w') as file:
-            json.dump(self.admins, file)
+        Args:
+            force (bool): Проверить счётчик изменений, не дожидаясь истечения ttl.
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and self._version is not None
+            and now - self._checked_at < self.ttl
+        ):
+            return
+        # Отметка ставится до запроса, чтобы одновременные проверки не шли в базу все разом
+        self._checked_at = now
+        async with self.pool.read() as conn:
+            cursor = await conn.execute(GET_VERSION_SQL)
+            (version,) = await cursor.fetchone()
+            if version == self._version:
+                return
+            cursor = await conn.execute(GET_ADMINS_SQL)
+            self.admins = {user_id for (user_id,) in await cursor.fetchall()}
+        self._version = version
 
     @staticmethod
     async def get_state() -> bool:
@@ -30,20 +74,27 @@ class AdminManager:
         """
         return config.super_admin_add()["function"] == "on"
 
-    async def add_admin(self, user_id: int) -> None:
+    async def add_admin(self, user_id: int) -> bool:
         """
         Добавляет пользователя в список администраторов.
 
         Args:
             user_id (int): Идентификатор пользователя, который нужно добавить в администраторы.
+
+        Returns:
+            bool: True, если пользователь добавлен, False, если он уже был администратором.
         """
-        if user_id not in self.admins:
-            self.admins.append(user_id)
-            self.save_admins()
+        async with self.pool.write() as conn:
+            cursor = await conn.execute(
+                "INSERT OR IGNORE INTO Admins (user_id) VALUES (?)", (user_id,)
+            )
+            added = cursor.rowcount > 0
+        await self.refresh(force=True)
+        if added:
             print(f"Добавлен новый администратор: {user_id}")
         else:
             print(f"Пользователь {user_id} уже является администратором")
-        print(f"Текущий список администраторов: {self.admins}")
+        return added
 
     async def get_admin(self, user_id: int) -> bool:
         """
@@ -55,7 +106,42 @@ class AdminManager:
         Returns:
             bool: True, если пользователь является администратором, иначе False.
         """
+        await self.refresh()
         return user_id in self.admins
 
+    async def import_legacy(self, path: str = ADMINS_FILE) -> int:
+        """
+        Перенос администраторов из прежнего файла JSON в базу данных.
+
+        После переноса файл переименовывается в ``<path>.imported``, чтобы
+        не переносить его повторно.
+
+        Args:
+            path (str): Путь к файлу со списком идентификаторов.
+
+        Returns:
+            int: Число перенесённых администраторов, которых ещё не было в базе.
+        """
+        if not os.path.exists(path):
+            return 0
+
+        def read_file() -> List[int]:
+            with open(path, "r") as file:
+                return [int(user_id) for user_id in json.load(file)]
+
+        user_ids = await asyncio.to_thread(read_file)
+        async with self.pool.write() as conn:
+            count = "SELECT COUNT(*) FROM Admins"
+            before = (await (await conn.execute(count)).fetchone())[0]
+            await conn.executemany(
+                "INSERT OR IGNORE INTO Admins (user_id) VALUES (?)",
+                [(user_id,) for user_id in user_ids],
+            )
+            imported = (await (await conn.execute(count)).fetchone())[0] - before
+        await asyncio.to_thread(os.replace, path, f"{path}.imported")
+        await self.refresh(force=True)
+        print(f"Перенесено администраторов из {path}: {imported}")
+        return imported
+
 
-admin = AdminManager()
+admin = AdminManager(db.pool, **config.get_admins())
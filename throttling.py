@@ -0,0 +1,200 @@
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Union
+
+from aiogram import types
+from aiogram.dispatcher.handler import CancelHandler, current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+# Ответ пользователю, превысившему ограничение; отправляется один раз подряд
+THROTTLED_REPLY = "Слишком много запросов. Подождите немного и повторите."
+
+
+class BucketTable:
+    """
+    Вёдра токенов по ключам: не больше ``capacity`` запросов подряд, далее
+    ``rate`` запросов в секунду на каждый ключ.
+
+    Ведро хранится списком [токены, время обновления] и только пока оно не
+    полное: полностью пополнившиеся вёдра удаляются при очистке, поэтому
+    память занимают лишь недавно активные ключи.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Args:
+            rate (float): Скорость пополнения, токенов в секунду.
+            capacity (float): Вместимость ведра (допустимый всплеск).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: Dict[Hashable, List[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def tokens(self, key: Hashable, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return self.capacity
+        return min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+
+    def wait(self, key: Hashable, now: float) -> float:
+        """
+        Args:
+            key (Hashable): Ключ ведра.
+            now (float): Текущее время по time.monotonic().
+
+        Returns:
+            float: Через сколько секунд в ведре появится токен; 0 — уже есть.
+        """
+        return max(0.0, (1 - self.tokens(key, now)) / self.rate)
+
+    def consume(self, key: Hashable, now: float) -> None:
+        self._buckets[key] = [self.tokens(key, now) - 1, now]
+
+    def sweep(self, now: float) -> None:
+        """
+        Удаление вёдер, которые успели пополниться полностью.
+        """
+        self._buckets = {
+            key: bucket
+            for key, bucket in self._buckets.items()
+            if bucket[0] + (now - bucket[1]) * self.rate < self.capacity
+        }
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Ограничение частоты запросов к обработчикам бота.
+
+    Для каждой группы обработчиков (модуля в handlers: common, admin, other)
+    задаются ведро токенов на пользователя и общее ведро на всех
+    пользователей. Запрос сверх ограничения не доходит до обработчика,
+    а пользователь получает короткий ответ только на первый из отклонённых
+    подряд запросов.
+    """
+
+    def __init__(
+        self, groups: Dict[str, Dict[str, float]], sweep_interval: float = 60.0
+    ) -> None:
+        """
+        Args:
+            groups (Dict[str, Dict[str, float]]): Ограничения по группам обработчиков:
+                rate и burst — запросов в секунду и допустимый всплеск на пользователя,
+                global_rate и global_burst — то же на всех пользователей группы.
+                0 — без ограничения.
+            sweep_interval (float): Как часто удалять неактивные вёдра, в секундах.
+        """
+        super().__init__()
+        self.configure(groups, sweep_interval)
+        # Пользователь -> когда ему ответили об ограничении; сбрасывается пропущенным запросом
+        self.warned: Dict[int, float] = {}
+        self.throttled = 0
+        self._swept_at = time.monotonic()
+
+    def configure(
+        self, groups: Dict[str, Dict[str, float]], sweep_interval: float = 60.0
+    ) -> None:
+        """
+        Установка ограничений по группам обработчиков (при запуске и при
+        изменении конфигурации). Накопленные вёдра сбрасываются.
+
+        Args:
+            groups (Dict[str, Dict[str, float]]): Ограничения по группам обработчиков.
+            sweep_interval (float): Как часто удалять неактивные вёдра, в секундах.
+        """
+        users: Dict[str, BucketTable] = {}
+        shared: Dict[str, BucketTable] = {}
+        for group, limits in groups.items():
+            if limits.get("rate"):
+                users[group] = BucketTable(limits["rate"], limits["burst"])
+            if limits.get("global_rate"):
+                shared[group] = BucketTable(
+                    limits["global_rate"], limits["global_burst"]
+                )
+        self.users, self.globals = users, shared
+        self.sweep_interval = sweep_interval
+
+    @staticmethod
+    def resolve_group(handler: Optional[Callable[..., Any]]) -> Optional[str]:
+        """
+        Args:
+            handler (Optional[Callable[..., Any]]): Выбранный диспетчером обработчик.
+
+        Returns:
+            Optional[str]: Имя модуля обработчика без пакета (common, admin, other).
+        """
+        if handler is None:
+            return None
+        return getattr(handler, "__module__", "").rsplit(".", 1)[-1]
+
+    def sweep(self, now: float) -> None:
+        for table in (*self.users.values(), *self.globals.values()):
+            table.sweep(now)
+        self.warned = {
+            user: warned_at
+            for user, warned_at in self.warned.items()
+            if now - warned_at < self.sweep_interval
+        }
+        self._swept_at = now
+
+    def check(self, group: str, user_id: int, now: float) -> float:
+        """
+        Проверка и списание токенов из вёдер пользователя и группы.
+
+        Args:
+            group (str): Группа обработчиков.
+            user_id (int): Идентификатор пользователя.
+            now (float): Текущее время по time.monotonic().
+
+        Returns:
+            float: 0, если запрос пропущен, иначе через сколько секунд повторить.
+        """
+        users = self.users.get(group)
+        shared = self.globals.get(group)
+        wait = max(
+            users.wait(user_id, now) if users is not None else 0.0,
+            shared.wait(None, now) if shared is not None else 0.0,
+        )
+        if not wait:
+            if users is not None:
+                users.consume(user_id, now)
+            if shared is not None:
+                shared.consume(None, now)
+        return wait
+
+    async def throttle(
+        self, event: Union[types.Message, types.CallbackQuery], user_id: int
+    ) -> None:
+        """
+        Raises:
+            CancelHandler: Если запрос превышает ограничение группы.
+        """
+        group = self.resolve_group(current_handler.get(None))
+        if group not in self.users and group not in self.globals:
+            return
+        now = time.monotonic()
+        if now - self._swept_at > self.sweep_interval:
+            self.sweep(now)
+        if not self.check(group, user_id, now):
+            self.warned.pop(user_id, None)
+            return
+        self.throttled += 1
+        if user_id not in self.warned:
+            self.warned[user_id] = now
+            # У сообщения ответ приходит в чат, у колбека — всплывающим уведомлением
+            await event.answer(THROTTLED_REPLY)
+        elif isinstance(event, types.CallbackQuery):
+            # Без ответа индикатор загрузки на кнопке висит до таймаута клиента
+            await event.answer()
+        raise CancelHandler()
+
+    async def on_process_message(
+        self, message: types.Message, _: Dict[str, Any]
+    ) -> None:
+        await self.throttle(message, message.from_user.id)
+
+    async def on_process_callback_query(
+        self, callback_query: types.CallbackQuery, _: Dict[str, Any]
+    ) -> None:
+        await self.throttle(callback_query, callback_query.from_user.id)
@@ -0,0 +1,164 @@
+import contextvars
+import cProfile
+import os
+import time
+from typing import Any, Dict, Optional
+
+from aiogram import Dispatcher, types
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+# Сведения о профилируемом обновлении; у остальных обновлений — None
+_profiled: contextvars.ContextVar[Optional[Dict[str, str]]] = contextvars.ContextVar(
+    "profiled_update", default=None
+)
+
+
+def get_update_type(update: types.Update) -> str:
+    """
+    Args:
+        update (types.Update): Обновление Telegram.
+
+    Returns:
+        str: Тип обновления (message, callback_query и т.д.).
+    """
+    return next((key for key in update.values if key != "update_id"), "unknown")
+
+
+class SlowUpdateProfiler(BaseMiddleware):
+    """
+    Профилирование медленных обновлений через cProfile.
+
+    Включённый профилировщик подменяет ``process_update`` диспетчера
+    обёрткой, которая профилирует обновление и сохраняет профиль в файл,
+    если обработка заняла дольше ``threshold`` секунд, а как middleware
+    запоминает выбранный обработчик. Выключенный профилировщик возвращает
+    исходный метод и убирает себя из middleware, поэтому обработка
+    обновлений идёт так же, как без него.
+
+    cProfile в потоке один, поэтому одновременно профилируется одно
+    обновление, а в профиль попадает и работа других задач цикла событий
+    за это время — это тоже полезно, когда медленность вызвана ими.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        threshold: float = 1.0,
+        directory: str = "profiles",
+        keep: int = 50,
+        enabled: bool = False,
+    ) -> None:
+        """
+        Args:
+            dispatcher (Dispatcher): Диспетчер aiogram.
+            threshold (float): Длительность обработки в секундах, начиная
+                с которой профиль сохраняется.
+            directory (str): Каталог для файлов профилей.
+            keep (int): Сколько последних файлов профилей хранить.
+            enabled (bool): Включить профилирование сразу.
+        """
+        super().__init__()
+        self.dispatcher = dispatcher
+        self.threshold = threshold
+        self.directory = directory
+        self.keep = keep
+        self.saved = 0
+        self._busy = False
+        if enabled:
+            self.enable()
+
+    @property
+    def enabled(self) -> bool:
+        return "process_update" in vars(self.dispatcher)
+
+    def enable(self, threshold: Optional[float] = None) -> None:
+        """
+        Включение профилирования.
+
+        Args:
+            threshold (Optional[float]): Новый порог в секундах; по умолчанию прежний.
+        """
+        if threshold is not None:
+            self.threshold = threshold
+        # Обёртка устанавливается атрибутом экземпляра поверх метода класса
+        self.dispatcher.process_update = self.process_update
+        manager = self.dispatcher.middleware
+        if self not in manager.applications:
+            self.setup(manager)
+            manager.applications.append(self)
+
+    def disable(self) -> None:
+        """
+        Выключение профилирования: возвращается исходный process_update.
+        """
+        if self.enabled:
+            del self.dispatcher.process_update
+        if self in self.dispatcher.middleware.applications:
+            self.dispatcher.middleware.applications.remove(self)
+
+    async def process_update(self, update: types.Update) -> Any:
+        process_update = Dispatcher.process_update.__get__(self.dispatcher)
+        if self._busy:
+            return await process_update(update)
+        self._busy = True
+        info = {"handler": "unhandled", "update_type": get_update_type(update)}
+        token = _profiled.set(info)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            return await process_update(update)
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - started
+            _profiled.reset(token)
+            self._busy = False
+            if seconds >= self.threshold:
+                self.save(profile, info, seconds)
+
+    def save(
+        self, profile: cProfile.Profile, info: Dict[str, str], seconds: float
+    ) -> str:
+        """
+        Сохранение профиля в файл и удаление старых файлов сверх ``keep``.
+
+        Имя файла содержит время, тип обновления, обработчик и длительность;
+        файл открывается через ``python -m pstats <файл>``.
+
+        Returns:
+            str: Путь к файлу профиля.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        name = (
+            f"{time.strftime('%Y%m%d-%H%M%S')}_{info['update_type']}_"
+            f"{info['handler']}_{seconds * 1000:.0f}ms.prof"
+        )
+        path = os.path.join(self.directory, name)
+        profile.dump_stats(path)
+        self.saved += 1
+        print(f"Медленное обновление ({seconds:.2f} с), профиль: {path}")
+        profiles = sorted(
+            entry.path
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(".prof")
+        )
+        for old in profiles[: max(0, len(profiles) - self.keep)]:
+            os.remove(old)
+        return path
+
+    @staticmethod
+    def record_handler() -> None:
+        info = _profiled.get()
+        handler = current_handler.get(None)
+        if info is not None and handler is not None:
+            module = handler.__module__.rsplit(".", 1)[-1]
+            info["handler"] = f"{module}.{handler.__name__}"
+
+    async def on_process_message(self, _: types.Message, __: Dict[str, Any]) -> None:
+        self.record_handler()
+
+    async def on_process_callback_query(
+        self, _: types.CallbackQuery, __: Dict[str, Any]
+    ) -> None:
+        self.record_handler()
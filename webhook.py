@@ -0,0 +1,133 @@
+import asyncio
+import hmac
+import os
+import secrets
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import Dispatcher, types
+from aiohttp import web
+from dotenv import load_dotenv
+
+from dispatch import UpdateQueue
+from resources import config
+
+load_dotenv()
+
+# Заголовок, в котором Telegram передаёт секрет, указанный при установке webhook
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """
+    Приём обновлений Telegram через webhook на встроенном сервере aiohttp.
+
+    Запрос проверяется по секретному токену и сразу ставится в очередь
+    обновлений, откуда их забирают её обработчики. Если очередь заполнена,
+    сервер отвечает 503 и Telegram повторит доставку позже.
+    """
+
+    def __init__(
+        self,
+        updates: UpdateQueue,
+        path: str = "/webhook",
+        secret_token: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            updates (UpdateQueue): Очередь обработки обновлений.
+            path (str): Путь, на который Telegram присылает обновления.
+            secret_token (Optional[str]): Секретный токен webhook. По умолчанию
+                берётся из переменной окружения WEBHOOK_SECRET, а без неё
+                генерируется при каждом запуске.
+        """
+        self.updates = updates
+        self.dispatcher = updates.dispatcher
+        self.path = path
+        self.secret_token = (
+            secret_token or os.getenv("WEBHOOK_SECRET") or secrets.token_urlsafe(32)
+        )
+        self.stats: Dict[str, int] = {"received": 0, "unauthorized": 0}
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """
+        Приём одного обновления от Telegram.
+        """
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token, self.secret_token):
+            self.stats["unauthorized"] += 1
+            return web.Response(status=401)
+        try:
+            update = types.Update(**await request.json())
+        except ValueError:
+            return web.Response(status=400)
+        try:
+            self.updates.put_nowait(update)
+        except asyncio.QueueFull:
+            return web.Response(status=503)
+        self.stats["received"] += 1
+        return web.Response()
+
+    async def handle_health(self, _: web.Request) -> web.Response:
+        """
+        Состояние сервера: заполненность очереди, время ожидания и счётчики обновлений.
+        """
+        return web.json_response({"status": "ok", **self.stats, **self.updates.stats()})
+
+    async def start_workers(self, _: Optional[web.Application] = None) -> None:
+        self.updates.start()
+
+    async def stop_workers(self, _: Optional[web.Application] = None) -> None:
+        """
+        Остановка обработчиков после обработки уже принятых обновлений.
+        """
+        await self.updates.stop()
+
+    def make_app(self) -> web.Application:
+        """
+        Returns:
+            web.Application: Приложение aiohttp с маршрутами webhook и /health.
+        """
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get("/health", self.handle_health)
+        app.on_startup.append(self.start_workers)
+        app.on_shutdown.append(self.stop_workers)
+        return app
+
+
+def start_webhook(
+    updates: UpdateQueue,
+    on_startup: Callable[[Dispatcher], Awaitable[Any]],
+    on_shutdown: Callable[[Dispatcher], Awaitable[Any]],
+) -> None:
+    """
+    Запуск бота в режиме webhook по настройкам из конфигурационного файла.
+
+    Args:
+        updates (UpdateQueue): Очередь обработки обновлений.
+        on_startup (Callable[[Dispatcher], Awaitable[Any]]): Функция запуска бота.
+        on_shutdown (Callable[[Dispatcher], Awaitable[Any]]): Функция завершения бота.
+    """
+    settings = config.get_webhook()
+    dispatcher = updates.dispatcher
+    server = WebhookServer(updates, path=settings["path"])
+    app = server.make_app()
+
+    async def startup(_: web.Application) -> None:
+        await on_startup(dispatcher)
+        await dispatcher.bot.set_webhook(
+            settings["url"].rstrip("/") + settings["path"],
+            secret_token=server.secret_token,
+            drop_pending_updates=True,
+        )
+
+    async def shutdown(_: web.Application) -> None:
+        await on_shutdown(dispatcher)
+        await dispatcher.storage.close()
+        await dispatcher.storage.wait_closed()
+        session = await dispatcher.bot.get_session()
+        await session.close()
+
+    app.on_startup.append(startup)
+    app.on_shutdown.append(shutdown)
+    web.run_app(app, host=settings["host"], port=settings["port"])